@@ -0,0 +1,181 @@
+import argparse
+import logging
+import os
+import re
+
+import numpy as np
+import openpyxl
+import pandas as pd
+from sqlalchemy.sql import text
+
+from data_registry import get_connection, invalidate_dataset
+
+logger = logging.getLogger(__name__)
+
+# ACS 5-year data profiles (DP02..DP05) for the state and its counties, one sheet per table.
+# Row 0 holds the geography of each group of four columns, row 1 their measures, then one row
+# per variable, with section headings (e.g. "COMPUTERS AND INTERNET USE") as rows without values.
+WORKBOOK_PATH = "data/acs2022_5yr_counties_hi.xlsx"
+MEASURES = ["Estimate", "Margin of Error", "Percent", "Percent Margin of Error"]
+STATE = "HawaiiState"  # as in use_pc_internet_by_county
+
+# 90% confidence level of published ACS margins of error
+Z_90 = 1.645
+
+INSERT_ESTIMATE = text("""
+    INSERT INTO acs_county_estimates
+        (Variable, County, YearRecord, TableId, Line, Section, Label, Estimate, EstimateMOE,
+         Percent, PercentMOE, Rate, RateMOE, CV)
+    VALUES (:Variable, :County, :YearRecord, :TableId, :Line, :Section, :Label, :Estimate, :EstimateMOE,
+            :Percent, :PercentMOE, :Rate, :RateMOE, :CV)
+    """)
+
+# Registry datasets reading acs_county_estimates; the views derived from them are dropped with them
+ACS_DATASETS = ["acs_catalog", "acs_section", "acs_variable", "usage_by_county"]
+
+COLUMNS = ["Variable", "County", "YearRecord", "TableId", "Line", "Section", "Label", "Estimate", "EstimateMOE",
+           "Percent", "PercentMOE", "Rate", "RateMOE", "CV"]
+
+
+def county_name(geography):
+    # "Maui County, Hawaii" -> "Maui County", the state itself -> STATE
+    name = str(geography).rsplit(",", 1)[0].strip()
+    return STATE if name == "Hawaii" else name
+
+
+def read_profile_sheet(sheet):
+    """Long rows (table, line, section, label, county, measure, raw value) of one sheet, streamed."""
+    rows = sheet.iter_rows(values_only=True)
+    geographies = next(rows)
+    measures = next(rows)
+    # Carry each geography across its group of measure columns
+    columns = []
+    county = None
+    for index, (geography, measure) in enumerate(zip(geographies, measures)):
+        if index == 0:
+            continue
+        county = county_name(geography) if geography else county
+        columns.append((index, county, measure))
+
+    table, section, line = sheet.title, None, 0
+    records = {key: [] for key in ("Line", "Section", "Label", "County", "Measure", "Value")}
+    for row in rows:
+        if not row or row[0] is None:
+            continue
+        values = [(county, measure, row[index]) for index, county, measure in columns if index < len(row)]
+        if all(value is None for _, _, value in values):
+            section = str(row[0]).strip()
+            continue
+        # Variables are numbered in sheet order, like the ACS variable codes (DP02_0153 ...)
+        line += 1
+        for county, measure, value in values:
+            records["Line"].append(line)
+            records["Section"].append(section)
+            records["Label"].append(str(row[0]).strip())
+            records["County"].append(county)
+            records["Measure"].append(measure)
+            records["Value"].append(value)
+    long = pd.DataFrame(records)
+    long.insert(0, "TableId", table)
+    return long
+
+
+def parse_values(raw):
+    """Published ACS cells to numbers: "±1,934" -> 1934, "*****" (controlled, no sampling error) -> 0,
+    "(X)", "N", "**", "-" (not applicable or not available) -> NaN."""
+    as_text = raw.astype("string").str.strip()
+    numbers = pd.to_numeric(as_text.str.replace(r"[±,]", "", regex=True), errors="coerce").astype(float)
+    return numbers.mask(as_text == "*****", 0.0)
+
+
+def derive_metrics(wide):
+    """Vectorized rates and margins of error, following the ACS handbook formulas for derived estimates."""
+    estimate = wide["Estimate"].to_numpy()
+    moe = wide["EstimateMOE"].to_numpy()
+
+    # Each share's universe is the nearest count above it in the table: "Total households" for
+    # "COMPUTERS AND INTERNET USE", "Females 16 years and over" for the female labor force, "Families"
+    # for family income brackets. Sub-universes may sit in an earlier section, so don't reset per section.
+    universe_line = (wide["Line"].where(wide["IsCount"])
+                     .groupby([wide["TableId"], wide["County"]], sort=False).ffill())
+    by_line = wide.set_index(["TableId", "Line", "County"])
+    universe_key = pd.MultiIndex.from_arrays([wide["TableId"], universe_line, wide["County"]])
+    universe_estimate = by_line["Estimate"].reindex(universe_key).to_numpy()
+    universe_moe = by_line["EstimateMOE"].reindex(universe_key).to_numpy()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = estimate / universe_estimate
+        # Proportion MOE; the ratio formula applies when the radicand turns negative
+        radicand = moe ** 2 - rate ** 2 * universe_moe ** 2
+        radicand = np.where(radicand < 0, moe ** 2 + rate ** 2 * universe_moe ** 2, radicand)
+        rate_moe = np.sqrt(radicand) / universe_estimate
+        # Coefficient of variation, above ~0.3 an estimate is usually flagged as unreliable
+        cv = (moe / Z_90) / estimate
+
+    # Only shares of the universe are rates; medians, means and other non-counts publish no percent
+    is_share = (wide["PercentMOE"].notna() | wide["IsCount"]).to_numpy()
+    rate = np.where(is_share & np.isfinite(rate), rate, np.nan)
+    rate_moe = np.where(is_share & np.isfinite(rate_moe), rate_moe, np.nan)
+    # Rates published without counts (unemployment, poverty) can't be derived, take them as published
+    published = np.isnan(estimate) & wide["PercentMOE"].notna().to_numpy()
+    wide["Rate"] = np.where(published, wide["Percent"], rate)
+    wide["RateMOE"] = np.where(published, wide["PercentMOE"], rate_moe)
+    wide["CV"] = np.where(np.isfinite(cv), cv, np.nan)
+    return wide
+
+
+def read_workbook(path, year):
+    # Read-only mode streams rows instead of building the whole workbook in memory
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        long = pd.concat([read_profile_sheet(sheet) for sheet in workbook.worksheets], ignore_index=True)
+    finally:
+        workbook.close()
+
+    long["Value"] = parse_values(long["Value"])
+    wide = (long
+            .set_index(["TableId", "Line", "Section", "Label", "County", "Measure"])["Value"]
+            .unstack("Measure")
+            .reindex(columns=MEASURES)
+            .reset_index())
+    wide.columns.name = None
+    wide = wide.rename(columns={"Margin of Error": "EstimateMOE", "Percent Margin of Error": "PercentMOE"})
+    # Percent margins are published in percentage points, percents as fractions
+    wide["PercentMOE"] = wide["PercentMOE"] / 100
+    # Counts repeat the estimate in the Percent column, with "(X)" as their margin
+    wide["IsCount"] = wide["PercentMOE"].isna() & wide["Percent"].eq(wide["Estimate"])
+    wide["Percent"] = wide["Percent"].where(wide["PercentMOE"].notna())
+
+    wide["YearRecord"] = year
+    wide["Variable"] = wide["TableId"] + "_" + wide["Line"].astype(str).str.zfill(4)
+    return derive_metrics(wide)[COLUMNS]
+
+
+def ingest(path=WORKBOOK_PATH, year=None, connection=None):
+    """Replace one year of acs_county_estimates with the contents of a profile workbook."""
+    if year is None:
+        match = re.search(r"acs(\d{4})", os.path.basename(path))
+        if not match:
+            raise ValueError(f"Can't tell the ACS year from {path}, pass it explicitly")
+        year = int(match.group(1))
+
+    estimates = read_workbook(path, year)
+    # NaN is not a valid SQL value
+    rows = estimates.astype(object).where(estimates.notna(), None).to_dict("records")
+    with (connection or get_connection()).session as session:
+        session.execute(text("DELETE FROM acs_county_estimates WHERE YearRecord = :year"), {"year": year})
+        session.execute(INSERT_ESTIMATE, rows)
+        session.commit()
+    for name in ACS_DATASETS:
+        invalidate_dataset(name)
+    logger.info("%d estimates for %d: %d variables, %d geographies", len(rows), year,
+                estimates['Variable'].nunique(), estimates['County'].nunique())
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description="Load an ACS 5-year profile workbook into acs_county_estimates.")
+    parser.add_argument("path", nargs="?", default=WORKBOOK_PATH)
+    parser.add_argument("--year", type=int, help="ACS release year (default: from the file name)")
+    args = parser.parse_args()
+    ingest(args.path, year=args.year)
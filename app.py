@@ -1,81 +1,78 @@
 import streamlit as st
 import streamlit.components.v1 as components
-import leafmap.foliumap as leafmap
-import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.ticker as ticker
-import plotly.express as px
-import streamlit_shadcn_ui as ui
-import json
-import seaborn as sns
-
-from st_circular_progress import CircularProgress
-from style_helper import apply_custom_style
 import pandas as pd
+import logging
+import time
 
-@st.cache_data
-def fetch_broadband_data():
-    conn = st.connection('mysql', type='sql')
-    df = conn.query('SELECT BroadbandCoverage, Latitude, Longitude FROM broadbcover_by_city', ttl=6)
-    return df
+from lazy_imports import lazy_module
+from style_helper import apply_custom_style
+from data_registry import load_dataset, prefetch_datasets
+from coverage_bins import show_coverage_map
+from gauges import gauge_figure, gauge_matrix
+from regression_stats import dataset_fits, regression_plot
+from budget_analytics import budget_rollups, draw_budget_overview
+from figure_cache import plotly_figure, show_pyplot
+
+# Loaded by the first card that draws with them
+px = lazy_module("plotly.express")
+ticker = lazy_module("matplotlib.ticker")
+
+logger = logging.getLogger(__name__)
+
+# Everything the landing page cards read, started together at the top of main()
+LANDING_DATASETS = [
+    "attendance",
+    "survey_class3",
+    "survey_class4",
+    "budget",
+    "readiness_by_dimensions",
+    "broadband_bins",
+    "telecom_filings_count",
+    "telecom_filings_page",
+    "campaign_top",
+    "campaign_filters",
+    "usage_hawaii_state",
+    "feedback_totals",
+]
 
-@st.cache_data
 def fetch_readiness_data():
-    conn = st.connection('mysql', type='sql')
-    df = conn.query('SELECT Dimension, Details, Unprepared, Old_Guard, Social_Users, Technical, Digital FROM readiness_by_dimensions', ttl=6)
-    return df
+    return load_dataset("readiness_by_dimensions")
+
+def fetch_campaign_fund_data(year=None, office=None, limit=5):
+    # Top N candidates by total contributions, for one election year and/or office or for all of them
+    params = {"limit": limit}
+    if year is not None:
+        params.update(year_from=year, year_to=year)
+    if office is not None:
+        params["office"] = office
+    return load_dataset("campaign_top", **params)
 
-@st.cache_data
-def fetch_campaign_fund_data():
-    conn = st.connection('mysql', type='sql')
-    df = conn.query('SELECT CandidateName, CampaignTotal FROM Campaign_Fund ORDER BY CampaignTotal DESC LIMIT 5', ttl=6)
-    return df
+def fetch_campaign_filters():
+    return load_dataset("campaign_filters")
 
-@st.cache_data
 def fetch_usage_data():
-    conn = st.connection('mysql', type='sql')
-    df = conn.query("""SELECT Use_pc_internet, County, Estimate_Perccent AS Estimate_Percent 
-        FROM use_pc_internet_by_county
-        WHERE County = 'HawaiiState' AND Use_pc_internet != 'Total households'""", ttl=6)
-    return df
+    return load_dataset("usage_hawaii_state")
 
 def fetch_feedback_data():
-    conn = st.connection('mysql', type='sql')
-    df = conn.query("""
-        SELECT
-            SUM(Satisfied) AS Satisfied,
-            SUM(Unsatisfied) AS Unsatisfied
-        FROM user_feedback;
-        """, ttl=6)
-    return df
-
-def fetch_budget_data():
-    data = pd.read_csv("data/budget.csv")
-
-    # Clean column names
-    data.columns = data.columns.str.strip().str.replace('/', '_')
-    
-    # Filter out Total rows for per-category breakdown
-    category_data = data[data['Category'] != 'Total']
-    total_data = data[data['Category'] == 'Total']
-    return category_data, total_data
+    return load_dataset("feedback_totals")
 
 def fetch_attendance_data():
-  df = pd.read_csv("data/Tbl_RegAttend.csv")
+    return load_dataset("attendance")
+
+def fetch_survey_data():
+    return load_dataset("survey_class3"), load_dataset("survey_class4")
 
-  # Remove completely empty columns (extra commas at the end of CSV)
-  df = df.dropna(axis=1, how='all')
+FILINGS_PAGE_SIZE = 10
 
-  # Filter to rows where Island == "Total"
-  df = df[df["Island"] == "Total"].copy()
+def fetch_telecom_filings_count():
+    return load_dataset("telecom_filings_count")
 
-  # Clean column names
-  df.columns = df.columns.str.strip().str.replace(' ', '_').str.replace('/', '_')
-  
-  # Convert all columns that can be numeric
-  for col in df.columns:
-    df[col] = pd.to_numeric(df[col], errors='ignore')  # keep strings like 'Island', 'textDate'
-  return df
+def fetch_telecom_filings_data(page=1):
+    # One page of telecom_filings, newest first
+    return load_dataset("telecom_filings_page", limit=FILINGS_PAGE_SIZE, offset=(page - 1) * FILINGS_PAGE_SIZE)
+
+def fetch_telecom_filings_sample():
+    return load_dataset("telecom_filings_sample")
 
 def get_header_style():
     # Define the style for the card and header
@@ -188,32 +185,8 @@ def show_device_access_card(tab):
 
         df = fetch_usage_data()
             
-        # Group by county and display each type in two columns for each county
-        for county, group in df.groupby("County", sort=False):
-            st.write(f"### {county}")  # Display the county name as a section header
-        
-            # Create two columns for displaying progress bars side by side
-            col1, col2 = st.columns(2)
-            
-            for i, (_, row) in enumerate(group.iterrows()):
-                # Alternate between columns for each type of internet usage
-                if i % 2 == 0:
-                    col = col1
-                    color = "#0778DF"
-                else:
-                    col = col2
-                    color = "#FF3583"
-    
-                percentage = int(row['Estimate_Percent'] * 100)
-    
-                # Display the type of internet usage and the progress bar
-                with col:
-                    cp = CircularProgress(
-                            label=row['Use_pc_internet'],
-                            value=percentage,
-                            color=color,
-                            key=f"cell_{i}_{col}")
-                    cp.st_circular_progress()  
+        # All counties and variables in one figure, rather than one component per value
+        st.plotly_chart(plotly_figure(gauge_figure, gauge_matrix(df)), use_container_width=True)
         
         # Close the card div
         # Add the footer with "Read more about it" and a button
@@ -247,29 +220,8 @@ def show_broadband_card(col):
         
         st.subheader("Broadband Connectivity Map")
         
-        # Create a Leaflet map centered at an example location
-        # Drop rows where coordinates couldn't be found
-        data = fetch_broadband_data()
-        data.dropna(subset=['Latitude', 'Longitude'], inplace=True)
-    
-        # Create Leafmap map
-        m = leafmap.Map(center=[20.5, -157.5], zoom=7)  # Center on Hawaii
-    
-        # Prepare data for heatmap
-        # data['BroadbandCoverage'] = data['BroadbandCoverage'].str.replace('%', '').astype(float)
-    
-        # Add heatmap layer
-        m.add_heatmap(data=data,
-                      latitude="Latitude",
-                      longitude="Longitude",
-                      value="BroadbandCoverage",
-                      name="Heat map",
-                      radius=15,
-                      blur=10, 
-                      max_val=100)
-            
-        # Display the map in Streamlit
-        m.to_streamlit(height=500)
+        # Coverage cells pre-aggregated by coverage_bins.py, rendered once per data version
+        show_coverage_map(zoom=7, height=500)
         
         # Close the card div
         # Add the footer with "Read more about it" and a button
@@ -357,12 +309,21 @@ def show_open_data_card(tab):
         
         create_card_header("Open Data")
 
+        # Narrow the ranking to one election year and/or office
+        filters = fetch_campaign_filters()
+        col1, col2 = st.columns(2)
+        year = col1.selectbox("Election year", ["All"] + sorted(filters['YearRecord'].unique().tolist(), reverse=True),
+                              key="campaign_year")
+        office = col2.selectbox("Office", ["All"] + sorted(o for o in filters['Office'].unique() if o),
+                                key="campaign_office")
+
         # Get data from the MySQL table
-        df = fetch_campaign_fund_data()
+        df = fetch_campaign_fund_data(year=None if year == "All" else int(year),
+                                      office=None if office == "All" else office)
         
         # Create a horizontal bar chart
         fig = px.bar(df, x="CampaignTotal", y="CandidateName", orientation='h',
-                     title="Top 5 Campaign Funds",
+                     title="Top 5 Campaign Funds" if year == "All" else f"Top 5 Campaign Funds, {year}",
                      labels={"CampaignTotal": "Total ($)", "CandidateName": "Candidate"})
 
         # Customize layout for better readability with long names
@@ -398,8 +359,10 @@ def show_user_feedback_card(tab):
 
     try:
         df = fetch_feedback_data()
-    except Exception as e:
-        return  # Exit the function early, don't render the card
+    except Exception:
+        # No database reachable: skip the card rather than break the home page
+        logger.warning("Couldn't load the feedback summary", exc_info=True)
+        return
 
     with tab:
         # Display the custom styles in Streamlit
@@ -484,12 +447,20 @@ def show_telecom_filings_table(tab):
         # Create a card layout with a blue header
         create_card_header("Telecom Filings")
     
-        # Load the JSON data
-        df = pd.read_json('data/sample.json')
-    
-        # Displaying the DataFrame with 'Filed Date' included
-        st.write("Sample Data table")
-        st.dataframe(df)
+        # Filings are loaded by filings_ingest.py, only the requested page is queried
+        filings = int(fetch_telecom_filings_count()['Filings'].iloc[0])
+        if filings:
+            pages = -(-filings // FILINGS_PAGE_SIZE)
+            page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1,
+                                   key="filings_page")
+            df = fetch_telecom_filings_data(page)
+            st.write(f"Recent filings, {filings} in total")
+            st.dataframe(df, hide_index=True)
+        else:
+            # Store not loaded yet
+            df = fetch_telecom_filings_sample()
+            st.write("Sample Data table")
+            st.dataframe(df)
         
         # Close the card div
         # Add the footer with "Read more about it" and a button
@@ -520,19 +491,8 @@ def show_budget_card(col):
         # Create a card layout with a blue header
         create_card_header("HSPLS Digital Literacy Classes Budget")
 
-        _, total_data = fetch_budget_data()
-
-        fig, ax = plt.subplots()
-        ax.bar(total_data['Date'], total_data['Budgeted'], label='Budgeted', alpha=0.6)
-        ax.bar(total_data['Date'], total_data['Used'], label='Used')
-        ax.set_ylabel("Amount ($)")
-        ax.set_title("Total Budget vs Used")
-        ax.legend()
-
-        # Format y-axis as $20K, $40K, etc.
-        ax.yaxis.set_major_formatter(ticker.FuncFormatter(lambda x, _: f"${int(x/1000)}K"))
-        
-        st.pyplot(fig)
+        # Rendered once for all sessions until the budget data changes, shared with pages/budget.py
+        show_pyplot(draw_budget_overview, budget_rollups().totals)
 
         # Add the footer with "Read more about it" and a button
         st.markdown("""
@@ -554,8 +514,7 @@ def show_survey_results_card(col):
         st.markdown(header_style, unsafe_allow_html=True)
         create_card_header("HSPLS Digital Literacy Classes Survey Results")
 
-        df3 = pd.read_excel("data/SurveyClass3.xlsx", engine="openpyxl")
-        df4 = pd.read_excel("data/SurveyClass4.xlsx", engine="openpyxl")
+        df3, df4 = fetch_survey_data()
 
         def plot_class_line(df, class_title):
             df_plot = df.iloc[:-1].melt(id_vars=df.columns[0], var_name="Date", value_name="Score")
@@ -583,6 +542,15 @@ def show_survey_results_card(col):
             </div>
         """, unsafe_allow_html=True)
         
+def draw_registration_costs(ax, df_total, fit):
+    regression_plot(ax, df_total, "Registered", "Total", fit)
+    ax.set_title("Total Expenses vs Registered User Count")
+    ax.set_xlabel("Registered User Count")
+    ax.set_ylabel("Total Expenses $")
+
+    # Format y-axis as $20K, $40K, etc.
+    ax.yaxis.set_major_formatter(ticker.FuncFormatter(lambda x, _: f"${int(x/1000)}K"))
+
 def show_attendance_card(col):
     # Set up a blue header style for the card
     header_style = get_header_style()
@@ -607,21 +575,7 @@ def show_attendance_card(col):
         # Drop rows with missing data in required columns
         df_total = df_total.dropna(subset=["Total", "Registered"])
 
-        fig, ax = plt.subplots()
-        sns.regplot(
-            x=df_total["Registered"],
-            y=df_total["Total"],
-            ax=ax,
-            scatter_kws={"s": 40}
-        )
-        ax.set_title("Total Expenses vs Registered User Count")
-        ax.set_xlabel("Registered User Count")
-        ax.set_ylabel("Total Expenses $")
-
-        # Format y-axis as $20K, $40K, etc.
-        ax.yaxis.set_major_formatter(ticker.FuncFormatter(lambda x, _: f"${int(x/1000)}K"))
-
-        st.pyplot(fig)
+        show_pyplot(draw_registration_costs, df_total, dataset_fits("attendance").loc[("Registered", "Total")])
 
         # Add the footer with "Read more about it" and a button
         st.markdown("""
@@ -865,8 +819,21 @@ after the HACC<o:p></o:p></b></p>
         """, unsafe_allow_html=True)
 
 
+# Cards shown in each landing page section, in display order
+LANDING_TABS = {
+    "HSPLS Overview": [show_attendance_card, show_survey_results_card, show_budget_card],
+    "Broadband Equity": [show_digital_literacy_card, show_broadband_card, show_digital_equity_card],
+    "Digital Transparency": [show_telecom_filings_table, show_open_data_card, show_income_distribution_card],
+    "Accessibility": [show_device_access_card, show_user_feedback_card],
+    "About Us": [show_about_us],
+}
+
 def main():
     apply_custom_style(suppress_anchor=True)
+
+    # Load all card data concurrently in the background; the visible cards only wait for their
+    # own datasets and switching sections later finds the others already cached
+    prefetch_datasets(LANDING_DATASETS)
     
     st.header("Bridging Hawaii's Digital Divide")
     
@@ -877,24 +844,15 @@ def main():
         """
     )
 
-    tab1, tab2, tab3, tab4, tab5 = st.tabs(["HSPLS Overview", "Broadband Equity", "Digital Transparency", "Accessibility", "About Us"])
-
-    show_attendance_card(tab1)
-    show_survey_results_card(tab1)
-    show_budget_card(tab1)
+    # Only the selected section is built; the choice is kept in session state across reruns
+    selected_tab = st.radio("Section", list(LANDING_TABS), horizontal=True,
+                            key="landing_tab", label_visibility="collapsed")
 
-    show_digital_literacy_card(tab2)
-    show_broadband_card(tab2)
-    show_digital_equity_card(tab2)
-
-    show_telecom_filings_table(tab3)
-    show_open_data_card(tab3)
-    show_income_distribution_card(tab3)
-
-    show_device_access_card(tab4)
-    show_user_feedback_card(tab4)
-    
-    show_about_us(tab5)
+    started = time.thread_time()
+    tab = st.container()
+    for show_card in LANDING_TABS[selected_tab]:
+        show_card(tab)
+    logger.debug("Rendered %s in %.1f ms of CPU", selected_tab, (time.thread_time() - started) * 1000)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,182 @@
+import argparse
+import glob
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Headless benchmark of app.py and the pages with Streamlit's AppTest, against a fresh embedded
+# SQLite database (embedded_db.py) instead of MySQL. Each page runs in its own process: one
+# cold run (empty caches, first imports), then warm runs as new sessions.
+BASELINE_PATH = "bench_baseline.json"
+WARM_RUNS = 3
+RUN_TIMEOUT = 120
+RESULT_MARKER = "BENCH_RESULT "
+
+# A page regresses when a metric grows beyond its tolerance: (relative, absolute)
+TOLERANCES = {
+    "cold_s": (0.25, 0.1),
+    "warm_s": (0.25, 0.05),
+    "cold_queries": (0, 0),
+    "warm_queries": (0, 0),
+    "delta_bytes": (0.10, 1024),
+    "peak_rss_mb": (0.10, 16),
+}
+
+
+def entry_points():
+    return ["app.py"] + sorted(glob.glob("pages/*.py"))
+
+
+def _instrument():
+    """Counters for SQL statements and delta message bytes, fed by hooks into SQLAlchemy and Streamlit."""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
+
+    counters = {"queries": 0, "delta_bytes": 0}
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def count_query(*args, **kwargs):
+        counters["queries"] += 1
+
+    enqueue = ForwardMsgQueue.enqueue
+
+    def count_delta(self, msg, *args, **kwargs):
+        if msg.WhichOneof("type") == "delta":
+            counters["delta_bytes"] += msg.ByteSize()
+        return enqueue(self, msg, *args, **kwargs)
+
+    ForwardMsgQueue.enqueue = count_delta
+    return counters
+
+
+def run_page(path, warm_runs):
+    """Measurements of one page, run in this process."""
+    counters = _instrument()
+    from streamlit.testing.v1 import AppTest
+
+    runs = []
+    for _ in range(1 + warm_runs):
+        counters.update(queries=0, delta_bytes=0)
+        start = time.perf_counter()
+        app = AppTest.from_file(path, default_timeout=RUN_TIMEOUT).run()
+        runs.append({
+            "wall_s": time.perf_counter() - start,
+            "queries": counters["queries"],
+            "delta_bytes": counters["delta_bytes"],
+            "exceptions": [exception.message.splitlines()[0][:200] for exception in app.exception],
+        })
+
+    cold, warm = runs[0], runs[1:]
+    return {
+        "cold_s": round(cold["wall_s"], 3),
+        "warm_s": round(statistics.median(run["wall_s"] for run in warm), 3) if warm else None,
+        "cold_queries": cold["queries"],
+        "warm_queries": max(run["queries"] for run in warm) if warm else None,
+        "delta_bytes": cold["delta_bytes"],
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "exceptions": sorted({message for run in runs for message in run["exceptions"]}),
+    }
+
+
+def measure(path, database, warm_runs):
+    """Run one page in a fresh interpreter, so imports, caches and peak RSS are its own."""
+    # The registry connects to the embedded database through these, see data_registry.db_backend
+    env = dict(os.environ, STREAMLIT_LOGGER_LEVEL="error", DB_BACKEND="sqlite", DB_PATH=database)
+    result = subprocess.run([sys.executable, __file__, "--child", path, "--runs", str(warm_runs)],
+                            capture_output=True, text=True, env=env)
+    for line in result.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    raise RuntimeError(f"Benchmark of {path} failed:\n{result.stderr[-2000:]}")
+
+
+def compare(results, baseline):
+    """Lines describing the metrics that regressed against the baseline."""
+    regressions = []
+    for path, metrics in results.items():
+        before = baseline.get(path)
+        if before is None:
+            continue
+        for metric, (relative, absolute) in TOLERANCES.items():
+            old, new = before.get(metric), metrics.get(metric)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + relative) + absolute:
+                regressions.append(f"{path}: {metric} {old} -> {new}")
+        new_errors = set(metrics["exceptions"]) - set(before.get("exceptions", []))
+        for message in sorted(new_errors):
+            regressions.append(f"{path}: new exception {message}")
+    return regressions
+
+
+def _print_table(results, baseline):
+    columns = ["cold_s", "warm_s", "cold_queries", "warm_queries", "delta_bytes", "peak_rss_mb"]
+    print(f"{'page':28}" + "".join(f"{column:>14}" for column in columns))
+    for path, metrics in results.items():
+        before = baseline.get(path, {})
+        cells = []
+        for column in columns:
+            value = metrics.get(column)
+            cell = "-" if value is None else f"{value:g}"
+            if before.get(column) not in (None, 0) and value is not None:
+                cell += f" {100 * (value - before[column]) / before[column]:+.0f}%"
+            cells.append(f"{cell:>14}")
+        print(f"{path:28}" + "".join(cells))
+        for message in metrics["exceptions"]:
+            print(f"    ! {message}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark app.py and pages/*.py headless against an embedded database.")
+    parser.add_argument("paths", nargs="*", help="scripts to run (default: app.py and pages/*.py)")
+    parser.add_argument("--runs", type=int, default=WARM_RUNS, help="warm runs per page, after the cold one")
+    parser.add_argument("--record", action="store_true", help=f"write the results to {BASELINE_PATH}")
+    parser.add_argument("--compare", action="store_true", help=f"exit 1 if a page regressed against {BASELINE_PATH}")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(RESULT_MARKER + json.dumps(run_page(args.child, args.runs)), flush=True)
+        return
+
+    from embedded_db import build_database
+
+    try:
+        with open(BASELINE_PATH, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)["pages"]
+    except FileNotFoundError:
+        baseline = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Rebuilt for every benchmark, so writes of one run never leak into the next
+        database = build_database(os.path.join(directory, "bench.sqlite"), "sqlite")
+        results = {path: measure(path, database, args.runs) for path in args.paths or entry_points()}
+
+    _print_table(results, baseline)
+    if args.record:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as out:
+            json.dump({
+                "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                            "cpus": os.cpu_count(), "warm_runs": args.runs},
+                "pages": {**baseline, **results},
+            }, out, indent=2)
+            out.write("\n")
+        print(f"Baseline written to {BASELINE_PATH}")
+    if args.compare:
+        regressions = compare(results, baseline)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data_registry import dataset_version, load_dataset
+from lazy_imports import lazy_module
+
+ticker = lazy_module("matplotlib.ticker")
+
+TOTAL = "Total"
+DATE_FORMAT = "%b-%y"  # "Jan-25", as in data/budget.csv
+# Months of spending averaged into the burn rate, and how far the remaining budget is projected
+BURN_WINDOW = 3
+PROJECTION_MONTHS = 12
+
+
+@dataclass(frozen=True)
+class BudgetRollups:
+    """Monthly budget figures as months x categories arrays, with the totals and projections built from them.
+
+    Shared across sessions, treat everything as read-only.
+    """
+    months: pd.DatetimeIndex
+    categories: pd.Index
+    used: np.ndarray
+    budgeted: np.ndarray
+    remaining: np.ndarray
+    totals: pd.DataFrame  # per month: Date, Used, Budgeted, Remaining, CumulativeUsed
+    burn: pd.DataFrame  # per category and Total: Remaining, BurnRate, MonthsLeft, RunsOut
+    projection: pd.DataFrame  # per month ahead: Remaining of the total at the current burn rate
+
+    def category(self, name):
+        """Used, Budgeted, Remaining and CumulativeUsed of one category, indexed by month."""
+        i = self.categories.get_loc(name)
+        return pd.DataFrame({
+            "Used": self.used[:, i],
+            "Budgeted": self.budgeted[:, i],
+            "Remaining": self.remaining[:, i],
+            "CumulativeUsed": np.cumsum(self.used[:, i]),
+        }, index=self.months)
+
+
+def budget_frame(data):
+    """The per-category rows with a real Month column, oldest first; Total rows are recomputed, not read."""
+    df = data[data["Category"].str.strip() != TOTAL]
+    df = df.assign(Month=pd.to_datetime(df["Date"], format=DATE_FORMAT), Category=df["Category"].str.strip())
+    df = df.sort_values("Month", kind="stable")
+    # Category spellings drift between monthly exports ("Profeional/C ontractual"): match them
+    # on the name without spaces and show the latest spelling
+    key = df["Category"].str.replace(r"\s+", "", regex=True)
+    return df.assign(Category=df.groupby(key)["Category"].transform("last"))
+
+
+def _months_ahead(month, months):
+    return month + pd.DateOffset(months=int(months))
+
+
+def compute_rollups(data):
+    df = budget_frame(data)
+    month_codes, months = pd.factorize(df["Month"], sort=True)
+    category_codes, categories = pd.factorize(df["Category"])
+    shape = (len(months), len(categories))
+
+    # Scatter the long rows into months x categories; a category missing in a month spent nothing
+    used = np.zeros(shape)
+    np.add.at(used, (month_codes, category_codes), df["Used"].to_numpy(dtype=float))
+    budgeted = np.full(shape, np.nan)
+    budgeted[month_codes, category_codes] = df["Budgeted"].to_numpy(dtype=float)
+    remaining = np.full(shape, np.nan)
+    remaining[month_codes, category_codes] = df["Remaining"].to_numpy(dtype=float)
+
+    total_used = used.sum(axis=1)
+    total_remaining = np.nansum(remaining, axis=1)
+    totals = pd.DataFrame({
+        "Date": months.strftime(DATE_FORMAT),
+        "Used": total_used,
+        "Budgeted": np.nansum(budgeted, axis=1),
+        "Remaining": total_remaining,
+        "CumulativeUsed": np.cumsum(total_used),
+    }, index=months)
+
+    # Burn rate: mean spending over the last months; months left at that pace from the latest remaining
+    burn_rate = np.append(used[-BURN_WINDOW:].mean(axis=0), total_used[-BURN_WINDOW:].mean())
+    latest_remaining = np.append(remaining[-1], total_remaining[-1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        months_left = np.where(burn_rate > 0, latest_remaining / burn_rate, np.inf)
+    runs_out = [_months_ahead(months[-1], np.ceil(left)) if np.isfinite(left) else pd.NaT for left in months_left]
+    burn = pd.DataFrame({
+        "Remaining": latest_remaining,
+        "BurnRate": burn_rate,
+        "MonthsLeft": months_left,
+        "RunsOut": pd.DatetimeIndex(runs_out),
+    }, index=categories.append(pd.Index([TOTAL])))
+
+    ahead = np.arange(1, PROJECTION_MONTHS + 1)
+    projection = pd.DataFrame(
+        {"Remaining": np.maximum(total_remaining[-1] - burn_rate[-1] * ahead, 0)},
+        index=pd.DatetimeIndex([_months_ahead(months[-1], k) for k in ahead]))
+
+    return BudgetRollups(months, categories, used, budgeted, remaining, totals, burn, projection)
+
+
+@st.cache_resource(max_entries=4)
+def _get_rollups(version):
+    return compute_rollups(load_dataset("budget"))
+
+
+def budget_rollups():
+    """Rollups of data/budget.csv, computed once per data version."""
+    return _get_rollups(dataset_version("budget"))
+
+
+def draw_budget_overview(ax, totals):
+    ax.bar(totals['Date'], totals['Budgeted'], label='Budgeted', alpha=0.6)
+    ax.bar(totals['Date'], totals['Used'], label='Used')
+    ax.set_ylabel("Amount ($)")
+    ax.set_title("Total Budget vs Used")
+    ax.legend()
+
+    # Format y-axis as $20K, $40K, etc.
+    ax.yaxis.set_major_formatter(ticker.FuncFormatter(lambda x, _: f"${int(x/1000)}K"))
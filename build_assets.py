@@ -0,0 +1,121 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import urllib.request
+
+from PIL import Image
+
+# Images and fonts for style_helper, served by Streamlit from static/ (server.enableStaticServing)
+# instead of raw.githubusercontent.com and Google Fonts. Built files carry a hash of their
+# content in the name, so a changed asset gets a new URL and old ones can be cached for good.
+STATIC_DIR = "static"
+MANIFEST_PATH = os.path.join(STATIC_DIR, "manifest.json")
+
+# Images style_helper shows: source -> width in px of the built variant, twice the largest displayed width for HiDPI screens
+IMAGES = {
+    "images/Aloha_white2.png": 300,  # header, max-width 150px
+    "images/arrow-left-s-line.png": 100,  # back link, 50px
+}
+WEBP_QUALITY = 85
+
+FONT_FAMILY = "Montserrat"
+FONT_WEIGHTS = (400, 700)
+FONT_CSS_URL = "https://fonts.googleapis.com/css2?family=Montserrat:wght@400;700&display=swap"
+# Google Fonts serves woff2 to browsers it recognizes, by user agent
+FONT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+FONT_SUBSET = "latin"
+
+
+def _hashed_name(stem, content, extension):
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:10]}.{extension}"
+
+
+def _write(directory, name, content):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name)
+    if not os.path.exists(path):
+        with open(path, "wb") as out:
+            out.write(content)
+    return path
+
+
+def build_image(source, width):
+    """Resize to width (never up) and encode as WebP; returns the path of the built file."""
+    with Image.open(source) as image:
+        image.load()
+    if image.width > width:
+        image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+    buffer = io.BytesIO()
+    # Lossless keeps the flat back arrow crisp, the header image compresses far better lossy
+    lossless = image.width <= 100
+    image.save(buffer, "WEBP", quality=WEBP_QUALITY, lossless=lossless, method=6)
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return _write(os.path.join(STATIC_DIR, "img"), _hashed_name(stem, buffer.getvalue(), "webp"), buffer.getvalue())
+
+
+def _fetch(url):
+    request = urllib.request.Request(url, headers={"User-Agent": FONT_USER_AGENT})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.read()
+
+
+def build_fonts():
+    """Download the woff2 files of the font's latin subset; returns {weight: path}."""
+    css = _fetch(FONT_CSS_URL).decode("utf-8")
+    fonts = {}
+    # One block per subset and weight, each preceded by a /* subset */ comment
+    for subset, block in re.findall(r"/\*\s*([\w-]+)\s*\*/\s*(@font-face\s*{[^}]*})", css):
+        weight = int(re.search(r"font-weight:\s*(\d+)", block).group(1))
+        if subset != FONT_SUBSET or weight not in FONT_WEIGHTS:
+            continue
+        content = _fetch(re.search(r"url\(([^)]+\.woff2)\)", block).group(1))
+        name = _hashed_name(f"{FONT_FAMILY.lower()}-{weight}", content, "woff2")
+        fonts[str(weight)] = _write(os.path.join(STATIC_DIR, "fonts"), name, content)
+    return fonts
+
+
+def _read_manifest():
+    try:
+        with open(MANIFEST_PATH, encoding="utf-8") as manifest:
+            return json.load(manifest)
+    except (OSError, ValueError):
+        return {}
+
+
+def build(fonts=True):
+    previous = _read_manifest()
+    manifest = {"images": {}, "fonts": previous.get("fonts", {})}
+    for source, width in IMAGES.items():
+        built = build_image(source, width)
+        manifest["images"][source] = built
+        print(f"{source} ({os.path.getsize(source) // 1024} KB) -> {built} ({os.path.getsize(built) // 1024} KB)")
+
+    if fonts:
+        try:
+            manifest["fonts"] = build_fonts()
+            print(f"{FONT_FAMILY} {', '.join(manifest['fonts'])} -> {STATIC_DIR}/fonts")
+        except OSError as error:
+            # Offline: keep the fonts of the previous build, they are committed under static/fonts
+            print(f"Couldn't download {FONT_FAMILY} ({error}), keeping {previous.get('fonts') or 'no fonts'}")
+
+    # Drop outputs of earlier builds that nothing refers to anymore
+    current = set(manifest["images"].values()) | set(manifest["fonts"].values())
+    for directory in ("img", "fonts"):
+        path = os.path.join(STATIC_DIR, directory)
+        for name in os.listdir(path) if os.path.isdir(path) else []:
+            if os.path.join(path, name) not in current:
+                os.remove(os.path.join(path, name))
+
+    with open(MANIFEST_PATH, "w", encoding="utf-8") as out:
+        json.dump(manifest, out, indent=2)
+        out.write("\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the optimized images and self-hosted fonts under static/.")
+    parser.add_argument("--no-fonts", action="store_true", help="only rebuild the images")
+    args = parser.parse_args()
+    build(fonts=not args.no_fonts)
@@ -0,0 +1,128 @@
+import argparse
+import logging
+import os
+
+import pandas as pd
+from sqlalchemy.sql import text
+
+from data_registry import dialect_statement, get_connection
+
+logger = logging.getLogger(__name__)
+
+# Columns of the Campaign Spending Commission export
+# "Campaign Contributions Received By Hawaii State and County Candidates"
+CANDIDATE_COLUMN = "Candidate Name"
+OFFICE_COLUMN = "Office"
+AMOUNT_COLUMN = "Amount"
+ELECTION_PERIOD_COLUMN = "Election Period"  # e.g. "2018-2020"
+DATE_COLUMN = "Date"
+
+CHUNK_ROWS = 20000
+
+# Adds a chunk's totals to the running totals, see Campaign_Totals in data/Create_Insert_Tables.sql
+UPSERT_TOTALS = {
+    "mysql": text("""
+        INSERT INTO Campaign_Totals (CandidateName, Office, YearRecord, CampaignTotal, Contributions)
+        VALUES (:candidate, :office, :year, :total, :contributions)
+        ON DUPLICATE KEY UPDATE
+            CampaignTotal = CampaignTotal + VALUES(CampaignTotal),
+            Contributions = Contributions + VALUES(Contributions)
+        """),
+    # SQLite and DuckDB, see embedded_db.py
+    "default": text("""
+        INSERT INTO Campaign_Totals (CandidateName, Office, YearRecord, CampaignTotal, Contributions)
+        VALUES (:candidate, :office, :year, :total, :contributions)
+        ON CONFLICT (YearRecord, Office, CandidateName) DO UPDATE SET
+            CampaignTotal = CampaignTotal + excluded.CampaignTotal,
+            Contributions = Contributions + excluded.Contributions
+        """),
+}
+
+UPSERT_STATE = {
+    "mysql": text("""
+        INSERT INTO Campaign_Ingest_State (SourceName, RowsIngested)
+        VALUES (:source, :rows)
+        ON DUPLICATE KEY UPDATE RowsIngested = RowsIngested + VALUES(RowsIngested)
+        """),
+    "default": text("""
+        INSERT INTO Campaign_Ingest_State (SourceName, RowsIngested)
+        VALUES (:source, :rows)
+        ON CONFLICT (SourceName) DO UPDATE SET RowsIngested = RowsIngested + excluded.RowsIngested
+        """),
+}
+
+
+def election_year(chunk):
+    # Year at the end of the election period, or the contribution's own year if that is missing
+    year = pd.to_numeric(chunk[ELECTION_PERIOD_COLUMN].str.strip().str[-4:], errors="coerce")
+    return year.fillna(pd.to_datetime(chunk[DATE_COLUMN], errors="coerce").dt.year)
+
+
+def aggregate_chunk(chunk):
+    amounts = pd.to_numeric(chunk[AMOUNT_COLUMN].str.replace(r"[$,]", "", regex=True), errors="coerce")
+    contributions = pd.DataFrame({
+        "candidate": chunk[CANDIDATE_COLUMN].str.strip(),
+        "office": chunk[OFFICE_COLUMN].fillna("").str.strip(),
+        "year": election_year(chunk),
+        "amount": amounts,
+    }).dropna(subset=["candidate", "year", "amount"])
+
+    totals = (contributions
+              .groupby(["candidate", "office", "year"], sort=False)["amount"]
+              .agg(total="sum", contributions="count")
+              .reset_index())
+    totals["year"] = totals["year"].astype(int)
+    return totals.to_dict("records")
+
+
+def ingest(path, source_name=None, rebuild=False, chunk_rows=CHUNK_ROWS, connection=None):
+    """Fold contribution records from path into Campaign_Totals, skipping rows already ingested.
+
+    Each chunk's totals and the row offset are committed together, so an interrupted run
+    resumes where it stopped without double counting.
+    """
+    source_name = source_name or os.path.basename(path)
+    connection = connection or get_connection()
+    upsert_totals = dialect_statement(UPSERT_TOTALS, connection)
+    upsert_state = dialect_statement(UPSERT_STATE, connection)
+
+    with connection.session as session:
+        # Before any source was ingested, Campaign_Totals only holds the seed rows from Campaign_Fund;
+        # the full file covers them, adding to them would count those candidates twice
+        first_ingest = session.execute(text("SELECT COUNT(*) FROM Campaign_Ingest_State")).scalar() == 0
+        if rebuild or first_ingest:
+            # Start over from the full file(s)
+            session.execute(text("DELETE FROM Campaign_Totals"))
+            session.execute(text("DELETE FROM Campaign_Ingest_State"))
+            session.commit()
+        done = session.execute(
+            text("SELECT RowsIngested FROM Campaign_Ingest_State WHERE SourceName = :source"),
+            {"source": source_name}).scalar() or 0
+
+    reader = pd.read_csv(
+        path,
+        usecols=[CANDIDATE_COLUMN, OFFICE_COLUMN, AMOUNT_COLUMN, ELECTION_PERIOD_COLUMN, DATE_COLUMN],
+        dtype=str,
+        skiprows=range(1, done + 1),
+        chunksize=chunk_rows)
+
+    for chunk in reader:
+        rows = aggregate_chunk(chunk)
+        with connection.session as session:
+            if rows:
+                session.execute(upsert_totals, rows)
+            session.execute(upsert_state, {"source": source_name, "rows": len(chunk)})
+            session.commit()
+        done += len(chunk)
+        logger.info("%s: %d rows ingested", source_name, done)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description="Stream campaign contribution records into Campaign_Totals.")
+    parser.add_argument("path", help="CSV export of campaign contributions")
+    parser.add_argument("--source-name", help="name the ingest offset is stored under (default: file name)")
+    parser.add_argument("--rebuild", action="store_true", help="clear all totals and offsets first")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+    ingest(args.path, source_name=args.source_name, rebuild=args.rebuild, chunk_rows=args.chunk_rows)
@@ -0,0 +1,148 @@
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.sql import text
+
+from data_registry import get_connection, invalidate_dataset, load_dataset
+from map_cache import HAWAII_CENTER, show_heatmap
+
+logger = logging.getLogger(__name__)
+
+# Broadband coverage pre-aggregated into square grid cells, one grid per map zoom level,
+# stored in broadband_bins (see data/Create_Insert_Tables.sql). Rebuild after loading data:
+#   python coverage_bins.py                     # from broadbcover_by_city
+#   python coverage_bins.py --csv points.csv    # e.g. FCC block-level availability, streamed in chunks
+# The map then asks for one zoom level inside one area, so its payload is bounded by the
+# number of cells on screen rather than the number of points behind them.
+ZOOM_LEVELS = range(6, 14)
+# Cells are web map tiles subdivided 2**CELL_SUBDIVISION times per side, i.e. 32 px at their zoom
+CELL_SUBDIVISION = 3
+CHUNK_ROWS = 500000
+
+# Southwest and northeast corners of the map views offered on the Broadband page
+AREAS = {
+    "Statewide": ((18.8, -160.3), (22.3, -154.7)),
+    "Kauaʻi": ((21.8, -160.3), (22.3, -159.2)),
+    "Oʻahu": ((21.2, -158.3), (21.75, -157.6)),
+    "Maui County": ((20.5, -157.35), (21.25, -155.95)),
+    "Hawaiʻi Island": ((18.8, -156.1), (20.3, -154.7)),
+}
+
+INSERT_BINS = text("""
+    INSERT INTO broadband_bins
+        (Zoom, CellX, CellY, Latitude, Longitude, MeanCoverage, MinCoverage, Providers, Points)
+    VALUES (:Zoom, :CellX, :CellY, :Latitude, :Longitude, :MeanCoverage, :MinCoverage, :Providers, :Points)
+    """)
+
+
+def cell_index(latitude, longitude, zoom):
+    """Grid cell (x, y) of each point at a zoom level, aligned with web mercator tiles."""
+    scale = 2.0 ** (zoom + CELL_SUBDIVISION)
+    x = (np.asarray(longitude) + 180.0) / 360.0 * scale
+    y = (1.0 - np.arcsinh(np.tan(np.radians(latitude))) / np.pi) / 2.0 * scale
+    return np.floor(x).astype(np.int64), np.floor(y).astype(np.int64)
+
+
+def viewport_params(zoom, area="Statewide"):
+    """broadband_bins dataset parameters selecting the cells of one area at one zoom level."""
+    (south, west), (north, east) = AREAS[area]
+    # y grows southwards in tile coordinates
+    x_min, y_max = cell_index(south, west, zoom)
+    x_max, y_min = cell_index(north, east, zoom)
+    return {"zoom": zoom, "x_min": int(x_min), "x_max": int(x_max), "y_min": int(y_min), "y_max": int(y_max)}
+
+
+# How partial aggregates of the same cell combine
+MERGE = {"LatitudeSum": "sum", "LongitudeSum": "sum", "CoverageSum": "sum",
+         "MinCoverage": "min", "Providers": "max", "Points": "sum"}
+
+
+def partial_bins(points):
+    # Sums rather than means, so partial results of separate chunks can be merged exactly
+    points = points.dropna(subset=["Latitude", "Longitude", "BroadbandCoverage"])
+    partials = []
+    for zoom in ZOOM_LEVELS:
+        x, y = cell_index(points["Latitude"].to_numpy(), points["Longitude"].to_numpy(), zoom)
+        partials.append(pd.DataFrame({
+            "Zoom": zoom, "CellX": x, "CellY": y,
+            "LatitudeSum": points["Latitude"].to_numpy(),
+            "LongitudeSum": points["Longitude"].to_numpy(),
+            "CoverageSum": points["BroadbandCoverage"].to_numpy(),
+            "MinCoverage": points["BroadbandCoverage"].to_numpy(),
+            "Providers": points["Providers"].to_numpy(),
+            "Points": 1,
+        }).groupby(["Zoom", "CellX", "CellY"]).agg(MERGE))
+    return pd.concat(partials)
+
+
+def finish_bins(partials):
+    bins = partials.groupby(level=["Zoom", "CellX", "CellY"]).agg(MERGE)
+    # Cells are drawn at the centroid of their points, not at the cell center
+    bins["Latitude"] = bins["LatitudeSum"] / bins["Points"]
+    bins["Longitude"] = bins["LongitudeSum"] / bins["Points"]
+    bins["MeanCoverage"] = bins["CoverageSum"] / bins["Points"]
+    bins = bins.reset_index()
+    # Towns without a provider count still contribute coverage
+    bins["Providers"] = bins["Providers"].astype(object).where(bins["Providers"].notna(), None)
+    return bins[["Zoom", "CellX", "CellY", "Latitude", "Longitude",
+                 "MeanCoverage", "MinCoverage", "Providers", "Points"]]
+
+
+def read_points(csv_path=None, chunk_rows=CHUNK_ROWS, connection=None):
+    columns = ["Latitude", "Longitude", "BroadbandCoverage", "Providers"]
+    if csv_path:
+        return pd.read_csv(csv_path, usecols=columns, chunksize=chunk_rows)
+    query = "SELECT Latitude, Longitude, BroadbandCoverage, Providers FROM broadbcover_by_city"
+    return pd.read_sql_query(query, (connection or get_connection()).engine, chunksize=chunk_rows)
+
+
+def build_bins(csv_path=None, chunk_rows=CHUNK_ROWS, connection=None):
+    """Aggregate all points into broadband_bins, replacing its contents in one transaction."""
+    partials = []
+    points_read = 0
+    connection = connection or get_connection()
+    for chunk in read_points(csv_path, chunk_rows, connection):
+        partials.append(partial_bins(chunk))
+        points_read += len(chunk)
+        # Merge as we go, so memory follows the number of cells rather than points
+        partials = [pd.concat(partials).groupby(level=["Zoom", "CellX", "CellY"]).agg(MERGE)]
+        logger.info("%d points binned", points_read)
+    if not partials:
+        logger.info("No points to bin")
+        return
+
+    bins = finish_bins(partials[0])
+    with connection.session as session:
+        session.execute(text("DELETE FROM broadband_bins"))
+        session.execute(INSERT_BINS, bins.to_dict("records"))
+        session.commit()
+    invalidate_dataset("broadband_bins")
+    logger.info("Cells per zoom level:\n%s", bins.groupby("Zoom").size().rename("cells").to_string())
+
+
+def show_coverage_map(zoom=7, area=None, metric="MeanCoverage", height=500):
+    """Heatmap of the stored cells of an area (all cells if None) at a zoom level.
+
+    Falls back to the raw towns while broadband_bins hasn't been built.
+    """
+    if load_dataset("broadband_bins").empty:
+        # Not built yet (python coverage_bins.py), the town list is small enough to send as is
+        return show_heatmap("broadband_points", height=height)
+    if area is None:
+        return show_heatmap("broadband_bins", params={"zoom": zoom}, height=height, value=metric, zoom=zoom,
+                            center=HAWAII_CENTER)
+    (south, west), (north, east) = AREAS[area]
+    return show_heatmap("broadband_bins", params=viewport_params(zoom, area), height=height, value=metric,
+                        center=((south + north) / 2, (west + east) / 2), zoom=zoom)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description="Pre-aggregate broadband coverage into broadband_bins.")
+    parser.add_argument("--csv", help="point file with Latitude, Longitude, BroadbandCoverage and Providers "
+                                      "columns (default: the broadbcover_by_city table)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+    build_bins(args.csv, chunk_rows=args.chunk_rows)
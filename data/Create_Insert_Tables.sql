@@ -245,4 +245,159 @@ VALUES
 (22, 'DeCoite, Lynn', 80195, 2020 ),
 (23, 'Higa, Stacy', 76350, 2020 ),
 (24, 'Tsuneyoshi, Earl', 67650, 2020 ),
-(25, 'Kitagawa, Lisa', 65010, 2020 );
\ No newline at end of file
+(25, 'Kitagawa, Lisa', 65010, 2020 );
+
+-- Table user_feedback
+-- Rows submitted from the Feedback page
+CREATE TABLE `user_feedback` (
+  `fid` int NOT NULL PRIMARY KEY AUTO_INCREMENT ,
+  `UserName` varchar (100),
+  `Email` varchar (250),
+  `Comments` text,
+  `Satisfied` tinyint NOT NULL DEFAULT 0,
+  `Unsatisfied` tinyint NOT NULL DEFAULT 0,
+  `DateUpdate` datetime default now()
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- Table feedback_summary
+-- Single counter row (sid = 1) kept in step with user_feedback by every insert,
+-- so the feedback pie chart never has to SUM over the whole table.
+-- Rebuild it from user_feedback with: python feedback_store.py
+-- This script drops and recreates the database; to add the table to an existing database
+-- without losing its feedback, run instead: python feedback_store.py --migrate
+CREATE TABLE `feedback_summary` (
+  `sid` tinyint NOT NULL PRIMARY KEY ,
+  `Satisfied` int NOT NULL DEFAULT 0,
+  `Unsatisfied` int NOT NULL DEFAULT 0,
+  `DateUpdate` datetime default now() on update now()
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+INSERT INTO `hacc2024`.`feedback_summary`
+(`sid`,
+`Satisfied`,
+`Unsatisfied`)
+VALUES
+(1, 0, 0 );
+
+
+-- Table Campaign_Totals
+-- Per-candidate, per-office, per-year contribution totals maintained by campaign_ingest.py,
+-- which streams the full contribution records file in chunks instead of loading it here.
+-- Seeded from the Campaign_Fund subset above; the first "python campaign_ingest.py <file>"
+-- replaces the seed with totals from the full file.
+CREATE TABLE `Campaign_Totals` (
+  `CandidateName` varchar (250) NOT NULL,
+  `Office` varchar (100) NOT NULL DEFAULT '',
+  `YearRecord` int NOT NULL,
+  `CampaignTotal` double NOT NULL DEFAULT 0,
+  `Contributions` int NOT NULL DEFAULT 0,
+  `DateUpdate` datetime default now() on update now(),
+  PRIMARY KEY (`YearRecord`, `Office`, `CandidateName`),
+  KEY `idx_campaign_totals_office` (`Office`, `YearRecord`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- Table Campaign_Ingest_State
+-- Rows of each source file already folded into Campaign_Totals, so re-runs only add new rows
+CREATE TABLE `Campaign_Ingest_State` (
+  `SourceName` varchar (250) NOT NULL PRIMARY KEY,
+  `RowsIngested` bigint NOT NULL DEFAULT 0,
+  `DateUpdate` datetime default now() on update now()
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+INSERT INTO `hacc2024`.`Campaign_Totals`
+(`CandidateName`,
+`Office`,
+`YearRecord`,
+`CampaignTotal`)
+SELECT `CandidateName`, '', `YearRecord`, `CampaignTotal` FROM `hacc2024`.`Campaign_Fund`;
+
+
+-- Table broadband_bins
+-- Coverage of broadbcover_by_city (or a block-level point file) aggregated per grid cell,
+-- one grid per map zoom level, so the map only receives the cells it shows.
+-- Built by: python coverage_bins.py
+CREATE TABLE `broadband_bins` (
+  `Zoom` tinyint NOT NULL,
+  `CellX` int NOT NULL,
+  `CellY` int NOT NULL,
+  `Latitude` double NOT NULL,
+  `Longitude` double NOT NULL,
+  `MeanCoverage` double NOT NULL,
+  `MinCoverage` double NOT NULL,
+  `Providers` int DEFAULT NULL,
+  `Points` int NOT NULL,
+  PRIMARY KEY (`Zoom`, `CellX`, `CellY`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+
+-- Table telecom_filings
+-- HPUC Telecommunications Services Industry Recent Filings Report, upserted by Filing Number.
+-- Load or refresh with: python filings_ingest.py
+CREATE TABLE `telecom_filings` (
+  `FilingNumber` varchar (20) NOT NULL PRIMARY KEY,
+  `DocketNumber` varchar (20),
+  `OriginatingAccount` varchar (250),
+  `RecordType` varchar (50),
+  `DocumentCategory` varchar (250),
+  `DocumentType` varchar (250),
+  `FiledDate` datetime NOT NULL,
+  `DateUpdate` datetime default now() on update now(),
+  KEY `idx_telecom_filings_filed` (`FiledDate`, `FilingNumber`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+
+-- Table acs_county_estimates
+-- ACS 5-year data profiles in long form, one row per variable, county and year, with derived
+-- rates and margins of error. Loaded from data/acs2022_5yr_counties_hi.xlsx by: python acs_ingest.py
+-- Seeded from the use_pc_internet_by_county subset above until then.
+CREATE TABLE `acs_county_estimates` (
+  `Variable` varchar (12) NOT NULL,
+  `County` varchar (50) NOT NULL,
+  `YearRecord` smallint NOT NULL,
+  `TableId` varchar (8) NOT NULL,
+  `Line` smallint NOT NULL,
+  `Section` varchar (150),
+  `Label` varchar (250),
+  `Estimate` double,
+  `EstimateMOE` double,
+  `Percent` double,
+  `PercentMOE` double,
+  `Rate` double,
+  `RateMOE` double,
+  `CV` double,
+  `DateUpdate` datetime default now(),
+  PRIMARY KEY (`Variable`, `County`, `YearRecord`),
+  KEY `idx_acs_county_estimates_section` (`YearRecord`, `TableId`, `Section`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+INSERT INTO `hacc2024`.`acs_county_estimates`
+(`Variable`,
+`County`,
+`YearRecord`,
+`TableId`,
+`Line`,
+`Section`,
+`Label`,
+`Estimate`,
+`EstimateMOE`,
+`Percent`,
+`PercentMOE`,
+`Rate`,
+`RateMOE`,
+`CV`)
+SELECT
+  CASE `Use_pc_internet` WHEN 'Total households' THEN 'DP02_0152' WHEN 'With a computer' THEN 'DP02_0153' ELSE 'DP02_0154' END,
+  `County`,
+  `YearRecord`,
+  'DP02',
+  CASE `Use_pc_internet` WHEN 'Total households' THEN 152 WHEN 'With a computer' THEN 153 ELSE 154 END,
+  'COMPUTERS AND INTERNET USE',
+  `Use_pc_internet`,
+  `Estimate`,
+  `Margin_Error`,
+  CASE WHEN `Use_pc_internet` = 'Total households' THEN NULL ELSE `Estimate_Perccent` END,
+  CASE WHEN `Use_pc_internet` = 'Total households' THEN NULL ELSE `Margin_Error_Percent` / 100 END,
+  CASE WHEN `Use_pc_internet` = 'Total households' THEN 1 ELSE `Estimate_Perccent` END,
+  CASE WHEN `Use_pc_internet` = 'Total households' THEN 0 ELSE `Margin_Error_Percent` / 100 END,
+  `Margin_Error` / 1.645 / `Estimate`
+FROM `hacc2024`.`use_pc_internet_by_county`;
@@ -0,0 +1,466 @@
+import hashlib
+import logging
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from load_metrics import metrics
+from sidecar_cache import read_csv_cached, read_excel_cached
+
+logger = logging.getLogger(__name__)
+
+# One hour for reference tables, shorter for data that changes under user traffic
+DEFAULT_TTL = 60 * 60
+FILE_TTL = 24 * 60 * 60
+FEEDBACK_TTL = 60
+DIAGNOSTICS_TTL = 10 * 60
+
+# Upper bound for everything held by the registry, across all sessions
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+# Shared by all sessions, so a burst of cold page views can't open unbounded DB connections
+PREFETCH_WORKERS = 6
+
+
+@dataclass(frozen=True)
+class Dataset:
+    source: str  # "sql", "csv", "xlsx" or "json"
+    target: object  # SQL statement (or a dict of them by dialect, see dialect_statement) or path of the data file
+    ttl: float = DEFAULT_TTL
+    read_options: dict = field(default_factory=dict)
+    transform: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None
+    params: dict = field(default_factory=dict)  # defaults for the bound parameters of a SQL target
+
+
+@dataclass(frozen=True)
+class View:
+    """A frame derived in-process from another registry dataset, instead of a query of its own.
+
+    Computed once per version of the base frame and cached alongside it; load_dataset,
+    dataset_version and invalidate_dataset take view names like any other dataset.
+    """
+    base: str  # registry dataset (or view) it is derived from
+    derive: Callable[[pd.DataFrame], pd.DataFrame]  # pure function of the base frame, must not modify it
+    params: dict = field(default_factory=dict)  # passed on to the base
+
+
+def _clean_budget(data):
+    # Clean column names
+    data.columns = data.columns.str.strip().str.replace('/', '_')
+    return data
+
+
+def _coverage_points(df):
+    return df[["BroadbandCoverage", "Latitude", "Longitude"]]
+
+
+def _usage_rates(df):
+    # The universe row of each county isn't a share
+    return df[df["Use_pc_internet"] != "Total households"]
+
+
+def _usage_hawaii_state(df):
+    state = df[df["County"] == "HawaiiState"]
+    return state[["Use_pc_internet", "County", "Estimate_Perccent"]].rename(
+        columns={"Estimate_Perccent": "Estimate_Percent"})
+
+
+def _label_filings(df):
+    # Show the report's own column names
+    from filings_ingest import COLUMNS
+    return df.rename(columns={column: field for field, column in COLUMNS.items()})
+
+
+# Tbl_RegAttend.csv: the columns kept and their types, parsed in one pass. The file carries
+# ~45 empty trailing columns and blank rows; only the declared columns are read.
+ATTENDANCE_SCHEMA = {
+    "realDate": "string",
+    "textDate": "category",
+    "Island": "category",
+    "Branches": "Int16",
+    "Classes_scheduled": "Int16",
+    "Registered": "Int32",
+    "Attended": "Int32",
+    "Attend_Rate": "float64",
+    "Peronnel": "float64",
+    "Profeional/Contractual": "float64",
+    "Travel": "float64",
+    "Marketing and Outreach": "float64",
+    "Indirect": "float64",
+    "Hardware": "float64",
+    "Total": "float64",
+}
+ATTENDANCE_READ_OPTIONS = {"engine": "pyarrow", "usecols": list(ATTENDANCE_SCHEMA), "dtype": ATTENDANCE_SCHEMA}
+
+
+def _clean_attendance(df):
+    # Filter to rows where Island == "Total"
+    df = df[df["Island"] == "Total"].copy()
+    df["Island"] = df["Island"].cat.remove_unused_categories()
+
+    # Clean column names
+    df.columns = df.columns.str.strip().str.replace(' ', '_').str.replace('/', '_')
+    return df
+
+
+DATASETS = {
+    "broadband_by_city": Dataset(
+        "sql", "SELECT City, County, Providers, BroadbandCoverage, Latitude, Longitude FROM broadbcover_by_city"),
+    "broadband_points": View("broadband_by_city", _coverage_points),
+    # Coverage per grid cell and zoom level, built by coverage_bins.py; the primary key
+    # (Zoom, CellX, CellY) turns a viewport into one index range scan
+    "broadband_bins": Dataset(
+        "sql", """SELECT Latitude, Longitude, MeanCoverage, MinCoverage, Providers, Points
+        FROM broadband_bins
+        WHERE Zoom = :zoom AND CellX BETWEEN :x_min AND :x_max AND CellY BETWEEN :y_min AND :y_max""",
+        params={"zoom": 7, "x_min": 0, "x_max": 2 ** 31, "y_min": 0, "y_max": 2 ** 31}),
+    "readiness_by_dimensions": Dataset(
+        "sql", "SELECT Dimension, Details, Unprepared, Old_Guard, Social_Users, Technical, Digital FROM readiness_by_dimensions"),
+    # Pre-aggregated by campaign_ingest.py; the primary key (YearRecord, Office, CandidateName)
+    # narrows any year/office slice to a short index range
+    "campaign_top": Dataset(
+        "sql", """SELECT CandidateName, SUM(CampaignTotal) AS CampaignTotal
+        FROM Campaign_Totals
+        WHERE YearRecord BETWEEN :year_from AND :year_to AND (:office IS NULL OR Office = :office)
+        GROUP BY CandidateName
+        ORDER BY CampaignTotal DESC
+        LIMIT :limit""",
+        params={"year_from": 0, "year_to": 9999, "office": None, "limit": 5}),
+    "campaign_filters": Dataset(
+        "sql", "SELECT DISTINCT YearRecord, Office FROM Campaign_Totals ORDER BY YearRecord DESC, Office"),
+    # ACS profiles loaded by acs_ingest.py; the primary key (Variable, County, YearRecord) serves
+    # acs_variable and idx_acs_county_estimates_section serves the section reads
+    "acs_variable": Dataset(
+        "sql", """SELECT Variable, County, YearRecord, Label, Estimate, EstimateMOE, Percent, PercentMOE,
+        Rate, RateMOE, CV
+        FROM acs_county_estimates
+        WHERE Variable = :variable
+        ORDER BY County <> 'HawaiiState', County, YearRecord""",
+        params={"variable": "DP02_0154"}),
+    "acs_catalog": Dataset(
+        "sql", """SELECT DISTINCT Variable, TableId, Line, Section, Label
+        FROM acs_county_estimates
+        WHERE YearRecord = :year
+        ORDER BY TableId, Line""",
+        params={"year": 2022}),
+    "acs_section": Dataset(
+        "sql", """SELECT Variable, County, Label, Estimate, EstimateMOE, Percent, PercentMOE, Rate, RateMOE, CV
+        FROM acs_county_estimates
+        WHERE YearRecord = :year AND TableId = :table AND Section = :section
+        ORDER BY County <> 'HawaiiState', County, Line""",
+        params={"year": 2022, "table": "DP02", "section": "COMPUTERS AND INTERNET USE"}),
+    # Device access, in the column names of the former use_pc_internet_by_county reads; one query
+    # serves the landing page card and the device access page
+    "usage_by_county": Dataset(
+        "sql", """SELECT Label AS Use_pc_internet, County, Estimate, Rate AS Estimate_Perccent,
+            EstimateMOE AS Margin_Error, RateMOE AS Margin_Error_Percent
+        FROM acs_county_estimates
+        WHERE YearRecord = :year AND TableId = 'DP02' AND Section = 'COMPUTERS AND INTERNET USE'
+        ORDER BY County <> 'HawaiiState', County, Line""",
+        params={"year": 2022}),
+    "usage_rates": View("usage_by_county", _usage_rates),
+    "usage_hawaii_state": View("usage_rates", _usage_hawaii_state),
+    # Counter row maintained by feedback_store.insert_feedback, O(1) however many rows user_feedback holds
+    "feedback_totals": Dataset(
+        "sql", "SELECT Satisfied, Unsatisfied FROM feedback_summary WHERE sid = 1", ttl=FEEDBACK_TTL),
+    "budget": Dataset("csv", "data/budget.csv", ttl=FILE_TTL, transform=_clean_budget),
+    "attendance": Dataset("csv", "data/Tbl_RegAttend.csv", ttl=FILE_TTL, read_options=ATTENDANCE_READ_OPTIONS,
+                          transform=_clean_attendance),
+    "survey_class3": Dataset("xlsx", "data/SurveyClass3.xlsx", ttl=FILE_TTL, read_options={"engine": "openpyxl"}),
+    "survey_class4": Dataset("xlsx", "data/SurveyClass4.xlsx", ttl=FILE_TTL, read_options={"engine": "openpyxl"}),
+    "telecom_filings_sample": Dataset("json", "data/sample.json", ttl=FILE_TTL),
+    # Loaded by filings_ingest.py; newest first, one page per (offset, limit), served by idx_telecom_filings_filed
+    "telecom_filings_page": Dataset(
+        "sql", """SELECT FilingNumber, DocketNumber, OriginatingAccount, RecordType, DocumentCategory,
+        DocumentType, FiledDate
+        FROM telecom_filings
+        ORDER BY FiledDate DESC, FilingNumber DESC
+        LIMIT :limit OFFSET :offset""",
+        transform=_label_filings, params={"limit": 10, "offset": 0}),
+    "telecom_filings_count": Dataset(
+        "sql", "SELECT COUNT(*) AS Filings, MAX(FiledDate) AS LastFiled FROM telecom_filings"),
+    # entities.csv plus Latitude/Longitude, precomputed by geocode_entities.py
+    "entities": Dataset("csv", "data/entities_geocoded.csv", ttl=FILE_TTL),
+    # Sizes of all tables in one catalog query, for pages/diagnostics.py; row counts are estimates
+    "table_sizes": Dataset("sql", {
+        "mysql": """SELECT TABLE_NAME AS TableName, TABLE_ROWS AS TableRows,
+            DATA_LENGTH AS DataBytes, INDEX_LENGTH AS IndexBytes
+            FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE()
+            ORDER BY DATA_LENGTH + INDEX_LENGTH DESC""",
+        "duckdb": """SELECT table_name AS TableName, estimated_size AS TableRows,
+            NULL AS DataBytes, NULL AS IndexBytes
+            FROM duckdb_tables()
+            ORDER BY estimated_size DESC""",
+        # SQLite has no information_schema; dbstat has the pages of every table and index
+        "default": """SELECT m.tbl_name AS TableName, NULL AS TableRows,
+            SUM(CASE WHEN m.type = 'table' THEN s.pgsize END) AS DataBytes,
+            SUM(CASE WHEN m.type = 'index' THEN s.pgsize END) AS IndexBytes
+            FROM sqlite_master m JOIN dbstat s ON s.name = m.name
+            GROUP BY m.tbl_name
+            ORDER BY SUM(s.pgsize) DESC""",
+    }, ttl=DIAGNOSTICS_TTL),
+}
+
+
+def estimate_size(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class BoundedCache:
+    """Thread-safe LRU cache with per-entry TTL and a total size bound in bytes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, _, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value, ttl=None, size=None):
+        # size overrides the estimate, for values estimate_size can't see into
+        size = estimate_size(value) if size is None else size
+        expires_at = time.monotonic() + ttl if ttl is not None else float("inf")
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            # Values larger than the whole cache are returned but never stored
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size, expires_at)
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._total_bytes, "max_bytes": self.max_bytes}
+
+    def invalidate(self, predicate=None):
+        with self._lock:
+            for key in [k for k in self._entries if predicate is None or predicate(k)]:
+                self._remove(key)
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._total_bytes -= size
+
+
+_cache = BoundedCache(MAX_CACHE_BYTES)
+_prefetch_pool = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+_load_locks = {}
+_load_locks_guard = threading.Lock()
+_versions = {}  # cache key -> (weak reference to the loaded frame, its fingerprint)
+
+
+def _load_lock(key):
+    with _load_locks_guard:
+        return _load_locks.setdefault(key, threading.Lock())
+
+
+def db_backend():
+    """"mysql", or the embedded "sqlite"/"duckdb" database (see embedded_db.py).
+
+    DB_BACKEND selects one; by default MySQL is used when [connections.mysql] is configured
+    in the secrets, SQLite otherwise.
+    """
+    backend = os.environ.get("DB_BACKEND")
+    if backend:
+        return backend.lower()
+    try:
+        configured = "mysql" in st.secrets.get("connections", {})
+    except FileNotFoundError:
+        configured = False
+    return "mysql" if configured else "sqlite"
+
+
+def get_connection():
+    backend = db_backend()
+    if backend == "mysql":
+        return st.connection('mysql', type='sql')
+    # Built from data/Create_Insert_Tables.sql and the data files on first use
+    from embedded_db import ensure_database
+    return st.connection(backend, type='sql', url=ensure_database(backend))
+
+
+def dialect_statement(statements, connection):
+    """The variant of a statement for the connection's SQL dialect, from a dict keyed by dialect
+    name with a "default" entry, for the upserts MySQL spells its own way."""
+    return statements.get(connection.engine.dialect.name, statements["default"])
+
+
+def _read(dataset, params):
+    if dataset.source == "sql":
+        connection = get_connection()
+        query = dataset.target if isinstance(dataset.target, str) else dialect_statement(dataset.target, connection)
+        # The registry owns caching, so bypass the connection's own query cache
+        return connection.query(query, ttl=0, params=params or None, **dataset.read_options)
+    if dataset.source == "csv":
+        # Typed once per file version and schema, later loads memory-map the columnar sidecar
+        return read_csv_cached(dataset.target, **dataset.read_options)
+    if dataset.source == "xlsx":
+        # Parsed once per workbook version, later loads memory-map the columnar sidecar
+        return read_excel_cached(dataset.target, **dataset.read_options)
+    if dataset.source == "json":
+        return pd.read_json(dataset.target, **dataset.read_options)
+    raise ValueError(f"Unknown dataset source: {dataset.source}")
+
+
+def _cache_key(name, params):
+    # Dataset defaults filled in, so explicit and implied defaults share an entry
+    params = {**DATASETS[name].params, **params}
+    return params, (name, tuple(sorted(params.items())))
+
+
+def _load_view(name, view, params):
+    base_params, base_key = _cache_key(view.base, params)
+    base = load_dataset(view.base, **base_params)
+    # Keyed by the base's content, so a reload with the same data keeps the derived frame
+    key = (name, tuple(sorted(params.items())), _frame_version(base_key, base))
+    df = _cache.get(key)
+    if df is not None:
+        metrics.hit(name)
+        return df
+    started = time.perf_counter()
+    df = view.derive(base)
+    size = estimate_size(df)
+    metrics.load(name, (time.perf_counter() - started) * 1000, rows=len(df), size=size)
+    _cache.put(key, df, _base_dataset(name).ttl, size=size)
+    return df
+
+
+def _base_dataset(name):
+    dataset = DATASETS[name]
+    while isinstance(dataset, View):
+        dataset = DATASETS[dataset.base]
+    return dataset
+
+
+def load_dataset(name, **params):
+    """Return the named dataset, loading it on a miss. Treat the result as read-only.
+
+    Keyword arguments override the dataset's default SQL parameters; each combination
+    is cached separately.
+    """
+    dataset = DATASETS[name]
+    params, key = _cache_key(name, params)
+    if isinstance(dataset, View):
+        return _load_view(name, dataset, params)
+    df = _cache.get(key)
+    if df is not None:
+        metrics.hit(name)
+        return df
+
+    # Only one thread loads a given dataset, the others wait and reuse its result
+    with _load_lock(key):
+        df = _cache.get(key)
+        if df is not None:
+            metrics.hit(name)
+            return df
+        started = time.perf_counter()
+        try:
+            df = _read(dataset, params)
+            if dataset.transform is not None:
+                df = dataset.transform(df)
+        except Exception:
+            metrics.load(name, (time.perf_counter() - started) * 1000)
+            raise
+        size = estimate_size(df)
+        metrics.load(name, (time.perf_counter() - started) * 1000, rows=len(df), size=size)
+        _cache.put(key, df, dataset.ttl, size=size)
+    return df
+
+
+def frame_fingerprint(df):
+    """Content hash of a frame: equal data gives an equal fingerprint across reloads and processes."""
+    digest = hashlib.sha1(repr((list(df.columns), list(df.dtypes.astype(str)))).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def dataset_version(name, **params):
+    """Fingerprint of the currently cached data, for keying anything derived from it.
+
+    Computed once per loaded frame; a reload with unchanged content keeps the version.
+    """
+    params, key = _cache_key(name, params)
+    return _frame_version(key, load_dataset(name, **params))
+
+
+def _frame_version(key, df):
+    entry = _versions.get(key)
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+    version = frame_fingerprint(df)
+    _versions[key] = (weakref.ref(df), version)
+    return version
+
+
+def cache_stats():
+    """Entries and bytes held by the registry, against its bound."""
+    return _cache.stats()
+
+
+def _with_views(name):
+    names = {name}
+    for view_name, view in DATASETS.items():
+        if isinstance(view, View) and view.base == name:
+            names |= _with_views(view_name)
+    return names
+
+
+def invalidate_dataset(name=None):
+    """Drop one dataset (all parameter combinations) and the views derived from it, or every dataset when name is None."""
+    if name is None:
+        _cache.invalidate()
+    else:
+        names = _with_views(name)
+        _cache.invalidate(lambda key: key[0] in names)
+
+
+def _prefetch_one(name, ctx):
+    # Attach the caller's script context so st.connection works from the pool thread
+    add_script_run_ctx(threading.current_thread(), ctx)
+    try:
+        return load_dataset(name)
+    except Exception:
+        # The card that needs this dataset retries the load and handles the error itself
+        logger.debug("Prefetch of %s failed", name, exc_info=True)
+        raise
+
+
+def prefetch_datasets(names):
+    """Start loading datasets on the shared pool and return a future per name.
+
+    A later load_dataset() call for the same name waits for the in-flight load
+    instead of issuing a second one.
+    """
+    ctx = get_script_run_ctx()
+    return {name: _prefetch_pool.submit(_prefetch_one, name, ctx) for name in names}
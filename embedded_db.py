@@ -0,0 +1,273 @@
+import argparse
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+# In-process stand-in for the MySQL database: data/Create_Insert_Tables.sql translated for
+# SQLite or DuckDB, plus the data files the ingest scripts load, in one file under data/.cache.
+# Used when no MySQL connection is configured (local runs, demos, tests) or when DB_BACKEND
+# selects it; DB_PATH overrides the file's location.
+SQL_SCRIPT = "data/Create_Insert_Tables.sql"
+DATABASE_DIR = "data/.cache"
+BACKENDS = ("sqlite", "duckdb")
+
+# Tables the app and the ingest scripts write to, kept across rebuilds of the file. Rows written at
+# runtime or ingested from files outside data/ replace the fresh seed; tables the build loads from
+# data/ keep the fresh load and gain the old rows it doesn't have (e.g. other ACS years).
+CARRIED_TABLES = ["user_feedback", "feedback_summary", "Campaign_Totals", "Campaign_Ingest_State"]
+MERGED_TABLES = ["acs_county_estimates", "telecom_filings", "broadband_bins"]
+
+_DATABASE_STATEMENT = re.compile(r"^(DROP DATABASE|CREATE DATABASE|USE)\b", re.IGNORECASE)
+_TABLE_OPTIONS = re.compile(r"\)\s*ENGINE\s*=.*$", re.IGNORECASE | re.DOTALL)
+_SCHEMA_PREFIX = re.compile(r"`\w+`\.(?=`)")
+_AUTO_INCREMENT = re.compile(r"`(\w+)`\s+int\s+NOT\s+NULL\s+PRIMARY\s+KEY\s+AUTO_INCREMENT\b", re.IGNORECASE)
+_NOW_DEFAULT = re.compile(r"\bdefault\s+now\(\)(\s+on\s+update\s+now\(\))?", re.IGNORECASE)
+_INLINE_KEY = re.compile(r",\s*KEY\s+`(\w+)`\s*\(([^)]*)\)", re.IGNORECASE)
+_CREATE_TABLE = re.compile(r"CREATE\s+TABLE\s+`?(\w+)`?", re.IGNORECASE)
+_BACKTICKED = re.compile(r"`(\w+)`")
+
+_ready = {}  # (backend, path) -> SQLAlchemy URL, once the file is built for this process
+_ready_lock = threading.Lock()
+
+
+def split_statements(script):
+    """Statements of a SQL script, without comments; semicolons inside quotes don't split."""
+    statements, current, quote = [], [], None
+    i = 0
+    while i < len(script):
+        char = script[i]
+        if quote:
+            current.append(char)
+            if char == "\\":
+                current.append(script[i + 1:i + 2])
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in "'\"`":
+            quote = char
+            current.append(char)
+        elif script.startswith("--", i) or char == "#":
+            # Comment to the end of the line
+            end = script.find("\n", i)
+            i = len(script) if end < 0 else end
+            continue
+        elif char == ";":
+            statements.append("".join(current).strip())
+            current = []
+        else:
+            current.append(char)
+        i += 1
+    statements.append("".join(current).strip())
+    return [statement for statement in statements if statement]
+
+
+def translate_statement(statement, backend="sqlite"):
+    """One MySQL statement of the schema script as statements for backend (tables come with their indexes)."""
+    if _DATABASE_STATEMENT.match(statement):
+        return []
+    statement = _SCHEMA_PREFIX.sub("", statement)
+    create = _CREATE_TABLE.match(statement)
+    before = []
+    if create:
+        table = create.group(1)
+        statement = _TABLE_OPTIONS.sub(")", statement)
+        if backend == "duckdb":
+            # DuckDB numbers rows from a sequence
+            if _AUTO_INCREMENT.search(statement):
+                before.append(f"CREATE SEQUENCE `{table}_seq`")
+            statement = _AUTO_INCREMENT.sub(rf"`\1` INTEGER PRIMARY KEY DEFAULT nextval('{table}_seq')", statement)
+        else:
+            statement = _AUTO_INCREMENT.sub(r"`\1` INTEGER PRIMARY KEY AUTOINCREMENT", statement)
+        # ON UPDATE has no column-level equivalent; writers set DateUpdate where it matters
+        statement = _NOW_DEFAULT.sub("DEFAULT CURRENT_TIMESTAMP", statement)
+        # Secondary keys are declared inline in MySQL, as separate indexes elsewhere
+        indexes = [f"CREATE INDEX `{name}` ON `{table}` ({columns})" for name, columns in _INLINE_KEY.findall(statement)]
+        statements = before + [_INLINE_KEY.sub("", statement)] + indexes
+    else:
+        statements = [statement]
+    if backend == "duckdb":
+        # Standard identifier quotes; the script has no backticks inside string literals
+        statements = [_BACKTICKED.sub(r'"\1"', statement) for statement in statements]
+    return statements
+
+
+def translate_script(script, backend="sqlite"):
+    return [translated for statement in split_statements(script)
+            for translated in translate_statement(statement, backend)]
+
+
+def _script_hash(script_path):
+    with open(script_path, "rb") as script:
+        return hashlib.sha256(script.read()).hexdigest()
+
+
+def database_path(backend):
+    return os.environ.get("DB_PATH") or os.path.join(DATABASE_DIR, f"hacc2024.{backend}")
+
+
+def connection_url(path, backend="sqlite"):
+    """SQLAlchemy URL of the database file, for st.connection(..., url=...)."""
+    return f"{backend}:///{os.path.abspath(path)}"
+
+
+def build_schema(path, backend="sqlite", script_path=SQL_SCRIPT):
+    """Create a database at path from the MySQL schema script, with its seed rows."""
+    with open(script_path, encoding="utf-8") as script:
+        statements = translate_script(script.read(), backend)
+    if backend == "duckdb":
+        import duckdb
+        connection = duckdb.connect(path)
+    else:
+        connection = sqlite3.connect(path)
+    try:
+        for statement in statements:
+            connection.execute(statement)
+        connection.commit()
+    finally:
+        connection.close()
+    return path
+
+
+def _auto_increment_columns(script_path):
+    with open(script_path, encoding="utf-8") as script:
+        statements = split_statements(script.read())
+    columns = {}
+    for statement in statements:
+        create, auto_increment = _CREATE_TABLE.match(statement), _AUTO_INCREMENT.search(statement)
+        if create and auto_increment:
+            columns[create.group(1)] = auto_increment.group(1)
+    return columns
+
+
+def _columns(connection, table):
+    return [column[0] for column in connection.execute(f'SELECT * FROM {table} LIMIT 0').description]
+
+
+def carry_over(old_path, new_path, backend="sqlite", script_path=SQL_SCRIPT):
+    """Copy the rows of CARRIED_TABLES and MERGED_TABLES from the database at old_path into new_path,
+    matching columns by name, so a rebuild for a changed schema script keeps what was written."""
+    if backend == "duckdb":
+        import duckdb
+        connection = duckdb.connect(new_path)
+        connection.execute(f"ATTACH '{os.path.abspath(old_path)}' AS old (READ_ONLY)")
+    else:
+        connection = sqlite3.connect(new_path)
+        connection.execute("ATTACH DATABASE ? AS old", (os.path.abspath(old_path),))
+    sequences = _auto_increment_columns(script_path) if backend == "duckdb" else {}
+    try:
+        for table in CARRIED_TABLES + MERGED_TABLES:
+            try:
+                old_columns = set(_columns(connection, f'old."{table}"'))
+            except Exception:
+                # Not in the old file: added to the script since it was built
+                continue
+            columns = ", ".join(f'"{column}"' for column in _columns(connection, f'"{table}"')
+                                if column in old_columns)
+            if table in CARRIED_TABLES:
+                connection.execute(f'DELETE FROM "{table}"')
+                insert = "INSERT INTO"
+            else:
+                insert = "INSERT OR IGNORE INTO"
+            connection.execute(f'{insert} "{table}" ({columns}) SELECT {columns} FROM old."{table}"')
+            if table in sequences:
+                # Copied ids don't advance DuckDB's sequence; draw it past them so new rows don't collide
+                connection.execute(f"""SELECT nextval('{table}_seq') FROM range(
+                    (SELECT COALESCE(MAX("{sequences[table]}"), 0) FROM "{table}"))""").fetchall()
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def load_data_files(connection):
+    """Run the ingest scripts over the files in data/, as a MySQL deployment would have them loaded."""
+    # Imported here: they import the registry, which imports this module to connect
+    import acs_ingest
+    import coverage_bins
+    import filings_ingest
+
+    acs_ingest.ingest(connection=connection)
+    filings_ingest.ingest(full=True, connection=connection)
+    coverage_bins.build_bins(connection=connection)
+
+
+def build_database(path, backend="sqlite", script_path=SQL_SCRIPT, data_files=True, keep_rows=True):
+    """Build the database file at path: schema and seed rows, then the data files.
+
+    An existing file is replaced only once the new one is complete, with its rows carried over
+    unless keep_rows is False (see carry_over).
+    """
+    if backend == "duckdb" and importlib.util.find_spec("duckdb_engine") is None:
+        raise RuntimeError("DB_BACKEND=duckdb needs the duckdb-engine package (pip install duckdb-engine)")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    build_schema(tmp_path, backend, script_path)
+    if data_files:
+        connection = st.connection(f"{backend}-bootstrap-{os.path.basename(tmp_path)}", type="sql",
+                                   url=connection_url(tmp_path, backend))
+        try:
+            load_data_files(connection)
+        finally:
+            # Release the file before it is moved into place
+            connection.engine.dispose()
+    if keep_rows and os.path.exists(path):
+        carry_over(path, tmp_path, backend, script_path)
+    os.replace(tmp_path, path)
+    with open(f"{path}.json", "w", encoding="utf-8") as manifest:
+        json.dump({"backend": backend, "script_sha256": _script_hash(script_path)}, manifest)
+    return path
+
+
+def _is_current(path, backend, script_path):
+    try:
+        with open(f"{path}.json", encoding="utf-8") as manifest:
+            built = json.load(manifest)
+    except (OSError, ValueError):
+        return False
+    return (os.path.exists(path) and built.get("backend") == backend
+            and built.get("script_sha256") == _script_hash(script_path))
+
+
+def ensure_database(backend="sqlite", script_path=SQL_SCRIPT):
+    """SQLAlchemy URL of the embedded database, building it first if it is missing or the schema
+    script changed since it was built. A rebuild keeps the rows the app and ingests wrote."""
+    path = database_path(backend)
+    key = (backend, path)
+    url = _ready.get(key)
+    if url is not None:
+        return url
+    with _ready_lock:
+        if key not in _ready:
+            if not _is_current(path, backend, script_path):
+                if os.path.exists(path):
+                    logger.warning("%s changed since %s was built, rebuilding it and carrying over its rows",
+                                   script_path, path)
+                else:
+                    logger.info("Building the embedded %s database %s from %s and data/", backend, path, script_path)
+                build_database(path, backend, script_path)
+            _ready[key] = connection_url(path, backend)
+    return _ready[key]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description="Build the embedded database from the schema script and data files.")
+    parser.add_argument("--backend", choices=BACKENDS, default=os.environ.get("DB_BACKEND", "sqlite"))
+    parser.add_argument("--path", help="database file (default: DB_PATH or data/.cache/hacc2024.<backend>)")
+    parser.add_argument("--schema-only", action="store_true", help="skip loading the data files")
+    parser.add_argument("--fresh", action="store_true",
+                        help="discard the rows of an existing file (feedback, campaign totals) instead of keeping them")
+    args = parser.parse_args()
+    target = args.path or database_path(args.backend)
+    built = build_database(target, args.backend, data_files=not args.schema_only, keep_rows=not args.fresh)
+    print(f"{SQL_SCRIPT} -> {built}")
@@ -0,0 +1,145 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from geocode_entities import fold_name
+
+# Columns of data/entities.csv
+AREA_COLUMN = "Geographic Area Served"
+TYPE_COLUMN = "Type of Entity"
+PILLARS_COLUMN = "Digital Equity Pillars"
+CAPABILITY_COLUMNS = [f"CP{i}" for i in range(1, 10)]
+
+# Islands as written in the inventory, folded by fold_name, to the county that serves them
+ISLAND_COUNTIES = {
+    "OAHU": "Honolulu",
+    "HAWAII": "Hawaiʻi", "HAWAII ISLAND": "Hawaiʻi",
+    "MAUI": "Maui", "MOLOKAI": "Maui", "LANAI": "Maui",
+    "KAUAI": "Kauaʻi", "NIIHAU": "Kauaʻi",
+    "STATEWIDE": "Statewide",
+    "ONLINE": "Online",
+}
+STATEWIDE = "Statewide"
+
+# Spelling variants of the same pillar, after lower-casing
+PILLAR_ALIASES = {
+    "digital navigators": "digital navigator",
+    "device avilability": "device availability",
+}
+MULTI_VALUE_SEPARATOR = r"\s*[;,]\s*"
+
+
+def pillar_parts(label):
+    # "Device Availability & Affordability" covers both "Device Availability" and "Device Affordability"
+    label = re.sub(r"\s+", " ", str(label)).strip()
+    parts = re.split(r"\s+(?:&|and)\s+", label, flags=re.IGNORECASE)
+    # Repeat the shared head word of the first part on the single-word parts after it
+    head = parts[0].rsplit(" ", 1)[0] if " " in parts[0] else ""
+    return [parts[0]] + [p if " " in p or not head else f"{head} {p}" for p in parts[1:]]
+
+
+def pillar_key(label):
+    # "Digital Navigators" and "digital navigator" are one pillar
+    label = re.sub(r"\s+", " ", str(label)).strip().lower()
+    return PILLAR_ALIASES.get(label, label)
+
+
+def county_key(area):
+    # "Niʻihau (Online)" is served on Niʻihau
+    area = fold_name(re.sub(r"\(.*?\)", "", area))
+    return ISLAND_COUNTIES.get(area, area.title())
+
+
+def _explode(values):
+    # One (row position, value) pair per item of a multi-valued cell
+    items = values.reset_index(drop=True).str.split(MULTI_VALUE_SEPARATOR).explode().dropna()
+    items = items.str.strip()
+    items = items[items.str.len() > 0]
+    return items.index.to_numpy(), items.to_numpy()
+
+
+class EntityIndex:
+    """Packed bitsets over the entity inventory, one per facet value.
+
+    Bit i of a bitset is set when row i of the indexed frame has that value, so a
+    facet query is a handful of vectorized AND/OR operations over n/8 bytes per value.
+    """
+
+    def __init__(self, df):
+        self.size = len(df)
+        self.facets = {
+            "pillar": self._postings(df[PILLARS_COLUMN], pillar_key, split=pillar_parts),
+            "county": self._postings(df[AREA_COLUMN], county_key, keep_spelling=False),
+            "type": self._postings(df[TYPE_COLUMN], str),
+            "capability": {
+                col: np.packbits(df[col].astype(str).str.strip().isin(["x", "1"]).to_numpy())
+                for col in CAPABILITY_COLUMNS
+            },
+        }
+        self.labels = {facet: sorted(postings) for facet, postings in self.facets.items()}
+        self.labels["capability"] = list(CAPABILITY_COLUMNS)
+
+    def _postings(self, values, key, keep_spelling=True, split=None):
+        positions, items = _explode(values.astype("string"))
+        if split is not None:
+            # A combined value is posted under each of its parts, e.g. both pillars of "A & B"
+            parts = pd.Series(items).map({item: split(item) for item in set(items)}).explode()
+            positions, items = positions[parts.index.to_numpy()], parts.to_numpy()
+        keys = pd.Series(items).map({item: key(item) for item in set(items)})
+        codes, uniques = pd.factorize(keys)
+
+        # One row of bits per distinct value, set in a single scatter
+        rows = np.zeros((len(uniques), self.size), dtype=bool)
+        rows[codes, positions] = True
+        packed = np.packbits(rows, axis=1)
+
+        labels = uniques
+        if keep_spelling:
+            # Show each value under its most common spelling
+            spellings = pd.DataFrame({"key": keys, "label": items})
+            labels = (spellings.groupby(["key", "label"]).size()
+                      .sort_values(ascending=False).reset_index()
+                      .drop_duplicates("key").set_index("key")["label"]
+                      .reindex(uniques))
+        return dict(zip(labels, packed))
+
+    def _all(self):
+        return np.packbits(np.ones(self.size, dtype=bool))
+
+    def _none(self):
+        return np.packbits(np.zeros(self.size, dtype=bool))
+
+    def match(self, pillars=(), capabilities=(), counties=(), types=(), include_statewide=True):
+        """Bitset of the rows having every pillar and capability, in any of the counties and types."""
+        bits = self._all()
+        for facet, values in (("pillar", pillars), ("capability", capabilities)):
+            for value in values:
+                bits &= self.facets[facet][value]
+
+        if counties:
+            if include_statewide and STATEWIDE in self.facets["county"]:
+                counties = [*counties, STATEWIDE]
+            bits &= self._any("county", counties)
+        if types:
+            bits &= self._any("type", types)
+        return bits
+
+    def _any(self, facet, values):
+        postings = [self.facets[facet][value] for value in values if value in self.facets[facet]]
+        return np.bitwise_or.reduce(postings) if postings else self._none()
+
+    def rows(self, bits):
+        """Row positions of the set bits, for df.iloc."""
+        return np.flatnonzero(np.unpackbits(bits, count=self.size))
+
+    def count(self, bits):
+        return int(np.unpackbits(bits, count=self.size).sum())
+
+    def facet_counts(self, facet, bits):
+        """Matches per value of a facet within bits, e.g. to label filter options."""
+        return {value: self.count(bits & posting) for value, posting in self.facets[facet].items()}
+
+    def query(self, df, **filters):
+        """Rows of df (the indexed frame) matching the filters, see match()."""
+        return df.iloc[self.rows(self.match(**filters))]
@@ -0,0 +1,22 @@
+import streamlit as st
+
+from data_registry import dataset_version, load_dataset
+
+# Renderers kept alive across reruns and sessions, one per dataset version
+MAX_RENDERERS = 16
+
+
+@st.cache_resource(max_entries=MAX_RENDERERS)
+def _get_renderer(name, params, version):
+    # pygwalker is heavy to import and only needed on the pages that explore data
+    from pygwalker.api.streamlit import StreamlitRenderer
+
+    # Kernel computation: the chart queries run in DuckDB inside the server process and only
+    # their aggregated results are sent to the browser, not the whole frame
+    return StreamlitRenderer(load_dataset(name, **dict(params)), kernel_computation=True)
+
+
+def show_explorer(name, **params):
+    """Render the pygwalker explorer for a registry dataset, reusing its renderer until the data changes."""
+    renderer = _get_renderer(name, tuple(sorted(params.items())), dataset_version(name, **params))
+    renderer.explorer()
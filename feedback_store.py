@@ -0,0 +1,279 @@
+import argparse
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+
+import streamlit as st
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from sqlalchemy.sql import text
+
+from data_registry import dialect_statement, get_connection, invalidate_dataset
+
+logger = logging.getLogger(__name__)
+
+# Submissions are appended here before the form returns and removed once committed,
+# so queued rows survive a restart
+SPOOL_PATH = "data/.feedback_spool.jsonl"
+# Rows that the database rejected outright, kept for manual review
+DEAD_LETTER_PATH = "data/.feedback_rejected.jsonl"
+
+QUEUE_SIZE = 1000
+BATCH_SIZE = 100
+FLUSH_INTERVAL = 1.0  # seconds to wait for more rows before writing a partial batch
+MAX_RETRY_DELAY = 30.0
+# Failures that aren't database errors (e.g. no connection configured) are retried this many
+# times, about two minutes with the backoff, before the rows are treated as rejected
+MAX_UNEXPECTED_FAILURES = 8
+
+INSERT_FEEDBACK = text("""
+    INSERT INTO user_feedback (UserName, Email, Comments, Satisfied, Unsatisfied)
+    VALUES (:username, :email, :comments, :satisfied_val, :unsatisfied_val)
+    """)
+
+# Counter row read by the feedback pie chart, see feedback_summary in data/Create_Insert_Tables.sql
+INCREMENT_SUMMARY = text("""
+    UPDATE feedback_summary
+    SET Satisfied = Satisfied + :satisfied_val, Unsatisfied = Unsatisfied + :unsatisfied_val
+    WHERE sid = 1
+    """)
+
+REBUILD_SUMMARY = {
+    "mysql": text("""
+        REPLACE INTO feedback_summary (sid, Satisfied, Unsatisfied)
+        SELECT 1, COALESCE(SUM(Satisfied), 0), COALESCE(SUM(Unsatisfied), 0)
+        FROM user_feedback
+        """),
+    # SQLite and DuckDB, see embedded_db.py
+    "default": text("""
+        INSERT OR REPLACE INTO feedback_summary (sid, Satisfied, Unsatisfied)
+        SELECT 1, COALESCE(SUM(Satisfied), 0), COALESCE(SUM(Unsatisfied), 0)
+        FROM user_feedback
+        """),
+}
+
+
+# Migration for databases created before feedback_summary existed: python feedback_store.py --migrate
+CREATE_SUMMARY = {
+    "mysql": text("""
+        CREATE TABLE IF NOT EXISTS feedback_summary (
+          sid tinyint NOT NULL PRIMARY KEY,
+          Satisfied int NOT NULL DEFAULT 0,
+          Unsatisfied int NOT NULL DEFAULT 0,
+          DateUpdate datetime default now() on update now()
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci
+        """),
+    "default": text("""
+        CREATE TABLE IF NOT EXISTS feedback_summary (
+          sid tinyint NOT NULL PRIMARY KEY,
+          Satisfied int NOT NULL DEFAULT 0,
+          Unsatisfied int NOT NULL DEFAULT 0,
+          DateUpdate datetime DEFAULT CURRENT_TIMESTAMP
+        )
+        """),
+}
+
+
+def feedback_row(username, email, comments, satisfied):
+    # Map satisfied input to binary values
+    satisfied_val = 1 if satisfied == "Yes" else 0
+    unsatisfied_val = 1 if satisfied == "No" else 0
+
+    # Default username to "Nobody" if empty
+    username = username if username else "Nobody"
+
+    return {
+        "username": username,
+        "email": email,
+        "comments": comments,
+        "satisfied_val": satisfied_val,
+        "unsatisfied_val": unsatisfied_val
+    }
+
+
+def write_feedback_rows(rows):
+    """Insert rows and bump the counters in one transaction."""
+    satisfied = sum(row["satisfied_val"] for row in rows)
+    unsatisfied = sum(row["unsatisfied_val"] for row in rows)
+
+    # The rows and the counters change together so they can't drift apart
+    connection = get_connection()
+    with connection.session as session:
+        # A list of parameter sets becomes one executemany, which the MySQL driver sends as a multi-row INSERT
+        session.execute(INSERT_FEEDBACK, rows)
+        result = session.execute(INCREMENT_SUMMARY, {"satisfied_val": satisfied, "unsatisfied_val": unsatisfied})
+        if result.rowcount == 0:
+            # The counter row is missing, rebuild it (this includes the rows just inserted)
+            session.execute(dialect_statement(REBUILD_SUMMARY, connection))
+        session.commit()
+
+    # The pie chart should include these submissions on the next rerun
+    invalidate_dataset("feedback_totals")
+
+
+# Function to insert feedback into the database
+def insert_feedback(username, email, comments, satisfied):
+    write_feedback_rows([feedback_row(username, email, comments, satisfied)])
+
+
+def _is_transient(error):
+    # Lost connections, lock wait timeouts and deadlocks surface as OperationalError
+    return isinstance(error, OperationalError) or getattr(error, "connection_invalidated", False)
+
+
+class FeedbackWriter:
+    """Bounded write-behind queue for feedback rows, drained in batches by a background thread.
+
+    Delivery is at-least-once: a crash between a commit and the spool rewrite replays
+    that batch on the next start.
+    """
+
+    def __init__(self, spool_path=SPOOL_PATH, maxsize=QUEUE_SIZE):
+        self.spool_path = spool_path
+        self.maxsize = maxsize
+        self._queue = queue.Queue()
+        self._pending = {}  # spool id -> row, everything enqueued but not yet committed
+        self._spool_lock = threading.Lock()
+
+        for row in self._read_spool():
+            self._pending[row["id"]] = row
+            self._queue.put(row)
+        if self._pending:
+            logger.info("Recovered %d queued feedback rows from %s", len(self._pending), spool_path)
+
+        self._thread = threading.Thread(target=self._run, name="feedback-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, row):
+        """Durably enqueue a row. Raises queue.Full when the queue is at capacity."""
+        row = dict(row, id=uuid.uuid4().hex)
+        with self._spool_lock:
+            if len(self._pending) >= self.maxsize:
+                raise queue.Full
+            with open(self.spool_path, "a", encoding="utf-8") as spool:
+                spool.write(json.dumps(row) + "\n")
+                spool.flush()
+                os.fsync(spool.fileno())
+            self._pending[row["id"]] = row
+        self._queue.put(row)
+
+    def _read_spool(self):
+        if not os.path.exists(self.spool_path):
+            return []
+        rows = []
+        with open(self.spool_path, encoding="utf-8") as spool:
+            for line in spool:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    # A torn final line from a crash mid-append was never acknowledged to the user
+                    logger.warning("Skipping unreadable line in %s", self.spool_path)
+        return rows
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while len(batch) < BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write_with_retry(batch)
+            self._acknowledge(batch)
+
+    def _write_with_retry(self, batch):
+        delay = 0.5
+        unexpected = 0
+        while True:
+            try:
+                write_feedback_rows(batch)
+                return
+            except SQLAlchemyError as error:
+                if not _is_transient(error):
+                    self._reject(batch)
+                    return
+                logger.warning("Feedback batch failed, retrying in %.1fs: %s", delay, error)
+            except Exception as error:
+                # e.g. the connection can't be created yet; the rows stay spooled until it can
+                unexpected += 1
+                if unexpected >= MAX_UNEXPECTED_FAILURES:
+                    self._reject(batch)
+                    return
+                logger.warning("Feedback batch failed, retrying in %.1fs: %s", delay, error)
+            time.sleep(delay)
+            delay = min(delay * 2, MAX_RETRY_DELAY)
+
+    def _reject(self, batch):
+        if len(batch) > 1:
+            # One bad row (e.g. an over-long email) fails the whole batch; retry the rows one
+            # by one so only the failing ones are dead-lettered
+            logger.warning("Feedback batch of %d rows rejected, retrying row by row", len(batch))
+            for row in batch:
+                self._write_with_retry([row])
+            return
+        logger.exception("Feedback row rejected, moving it to %s", DEAD_LETTER_PATH)
+        self._dead_letter(batch)
+
+    def _dead_letter(self, batch):
+        with open(DEAD_LETTER_PATH, "a", encoding="utf-8") as rejected:
+            for row in batch:
+                rejected.write(json.dumps(row) + "\n")
+
+    def _acknowledge(self, batch):
+        # Rewrite the spool with only the rows still pending, atomically
+        with self._spool_lock:
+            for row in batch:
+                self._pending.pop(row["id"], None)
+            tmp_path = self.spool_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as spool:
+                for row in self._pending.values():
+                    spool.write(json.dumps(row) + "\n")
+                spool.flush()
+                os.fsync(spool.fileno())
+            os.replace(tmp_path, self.spool_path)
+
+
+@st.cache_resource
+def get_feedback_writer():
+    # One writer (and one spool owner) per server process
+    return FeedbackWriter()
+
+
+def enqueue_feedback(username, email, comments, satisfied):
+    """Queue a submission for the background writer, or insert it directly if the queue is full."""
+    row = feedback_row(username, email, comments, satisfied)
+    try:
+        get_feedback_writer().submit(row)
+    except queue.Full:
+        logger.warning("Feedback queue full, inserting synchronously")
+        write_feedback_rows([row])
+
+
+def reconcile_feedback_summary(create=False):
+    """Rebuild the counter row from user_feedback, e.g. after rows were edited by hand.
+
+    With create, first add the feedback_summary table if the database doesn't have it yet.
+    """
+    connection = get_connection()
+    with connection.session as session:
+        if create:
+            session.execute(dialect_statement(CREATE_SUMMARY, connection))
+        session.execute(dialect_statement(REBUILD_SUMMARY, connection))
+        session.commit()
+    invalidate_dataset("feedback_totals")
+
+
+if __name__ == "__main__":
+    # Reconciliation job: python feedback_store.py
+    parser = argparse.ArgumentParser(description="Rebuild the feedback_summary counters from user_feedback.")
+    parser.add_argument("--migrate", action="store_true",
+                        help="create the feedback_summary table first, for databases that predate it")
+    args = parser.parse_args()
+    reconcile_feedback_summary(create=args.migrate)
@@ -0,0 +1,80 @@
+import io
+import threading
+
+import pandas as pd
+import streamlit as st
+
+from data_registry import BoundedCache, frame_fingerprint
+from lazy_imports import lazy_module
+
+# Only imported when a chart is rendered, cache hits never need matplotlib
+mpl_figure = lazy_module("matplotlib.figure")
+
+# Rendered charts shared by all sessions: PNG bytes of matplotlib charts, built plotly figures
+MAX_FIGURE_BYTES = 32 * 1024 * 1024
+
+# What st.pyplot uses, so cached charts look the same as before
+SAVEFIG_OPTIONS = {"format": "png", "dpi": 200, "bbox_inches": "tight"}
+
+_figure_cache = BoundedCache(MAX_FIGURE_BYTES)
+# Matplotlib's text and font caches are not thread-safe, render one chart at a time
+_render_lock = threading.Lock()
+
+
+def _input_key(value):
+    if isinstance(value, pd.DataFrame):
+        return frame_fingerprint(value)
+    if isinstance(value, pd.Series):
+        return frame_fingerprint(value.to_frame())
+    return value
+
+
+def _figure_key(kind, build, data, params):
+    # Page scripts all run as __main__, the file tells their chart functions apart
+    return (kind, build.__code__.co_filename, build.__qualname__,
+            tuple(_input_key(value) for value in data), tuple(sorted(params.items())))
+
+
+def render_png(draw, *data, **params):
+    """PNG of draw(ax, *data, **params), rendered once per input content and parameters.
+
+    draw gets the axes of a fresh figure that is never registered with pyplot, and the figure
+    is cleared once saved, so nothing accumulates in pyplot's global figure list.
+    """
+    key = _figure_key("png", draw, data, params)
+    png = _figure_cache.get(key)
+    if png is not None:
+        return png
+
+    with _render_lock:
+        png = _figure_cache.get(key)
+        if png is None:
+            fig = mpl_figure.Figure()
+            try:
+                draw(fig.subplots(), *data, **params)
+                buffer = io.BytesIO()
+                fig.savefig(buffer, **SAVEFIG_OPTIONS)
+                png = buffer.getvalue()
+            finally:
+                fig.clear()
+            _figure_cache.put(key, png)
+    return png
+
+
+def show_pyplot(draw, *data, **params):
+    """Drop-in for building a pyplot figure and passing it to st.pyplot, served from the cache."""
+    st.image(render_png(draw, *data, **params), width="stretch")
+
+
+def plotly_figure(build, *data, **params):
+    """build(*data, **params), a plotly figure, built once per input content and parameters.
+
+    The figure is shared across sessions; treat it as read-only.
+    """
+    key = _figure_key("plotly", build, data, params)
+    fig = _figure_cache.get(key)
+    if fig is None:
+        fig = build(*data, **params)
+        # Charged by the size of its JSON spec, what st.plotly_chart sends to the browser
+        _figure_cache.put(key, fig, size=len(fig.to_json()))
+    return fig
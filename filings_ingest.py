@@ -0,0 +1,156 @@
+import argparse
+import json
+import logging
+
+import pandas as pd
+from sqlalchemy.sql import text
+
+from data_registry import dialect_statement, get_connection, invalidate_dataset
+
+logger = logging.getLogger(__name__)
+
+# HPUC "Telecommunications Services Industry Recent Filings Report", exported as a JSON array
+REPORT_PATH = "data/Telecommunications Services Industry Recent Filings Report.json"
+
+# Report field -> telecom_filings column, see data/Create_Insert_Tables.sql
+COLUMNS = {
+    "Filing Number": "FilingNumber",
+    "Docket/Case No.": "DocketNumber",
+    "Originating Account": "OriginatingAccount",
+    "Record Type Name": "RecordType",
+    "Document Category": "DocumentCategory",
+    "Document Type": "DocumentType",
+    "Filed Date": "FiledDate",
+}
+
+BATCH_ROWS = 1000
+READ_BLOCK = 64 * 1024
+
+UPSERT_FILING = {
+    "mysql": text("""
+        INSERT INTO telecom_filings
+            (FilingNumber, DocketNumber, OriginatingAccount, RecordType, DocumentCategory, DocumentType, FiledDate)
+        VALUES (:FilingNumber, :DocketNumber, :OriginatingAccount, :RecordType, :DocumentCategory, :DocumentType,
+                :FiledDate)
+        ON DUPLICATE KEY UPDATE
+            DocketNumber = VALUES(DocketNumber),
+            OriginatingAccount = VALUES(OriginatingAccount),
+            RecordType = VALUES(RecordType),
+            DocumentCategory = VALUES(DocumentCategory),
+            DocumentType = VALUES(DocumentType),
+            FiledDate = VALUES(FiledDate)
+        """),
+    # SQLite and DuckDB, see embedded_db.py
+    "default": text("""
+        INSERT INTO telecom_filings
+            (FilingNumber, DocketNumber, OriginatingAccount, RecordType, DocumentCategory, DocumentType, FiledDate)
+        VALUES (:FilingNumber, :DocketNumber, :OriginatingAccount, :RecordType, :DocumentCategory, :DocumentType,
+                :FiledDate)
+        ON CONFLICT (FilingNumber) DO UPDATE SET
+            DocketNumber = excluded.DocketNumber,
+            OriginatingAccount = excluded.OriginatingAccount,
+            RecordType = excluded.RecordType,
+            DocumentCategory = excluded.DocumentCategory,
+            DocumentType = excluded.DocumentType,
+            FiledDate = excluded.FiledDate
+        """),
+}
+
+
+def iter_json_array(path, block_size=READ_BLOCK):
+    """Yield the elements of a top-level JSON array, holding one read block and one element in memory."""
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as source:
+        buffer = ""
+        started = False
+        while True:
+            block = source.read(block_size)
+            buffer += block
+            position = 0
+            while True:
+                # Skip whitespace and the separators between elements
+                while position < len(buffer) and buffer[position] in " \t\r\n,":
+                    position += 1
+                if not started and position < len(buffer):
+                    if buffer[position] != "[":
+                        raise ValueError(f"{path} is not a JSON array")
+                    started = True
+                    position += 1
+                    continue
+                if position < len(buffer) and buffer[position] == "]":
+                    return
+                try:
+                    element, end = decoder.raw_decode(buffer, position)
+                except ValueError:
+                    # The element continues in the next block
+                    break
+                yield element
+                position = end
+            buffer = buffer[position:]
+            if not block:
+                if buffer.strip():
+                    raise ValueError(f"{path} ends inside an element")
+                return
+
+
+def filing_row(record):
+    row = {column: record.get(field) for field, column in COLUMNS.items()}
+    for column, value in row.items():
+        # The export wraps values containing commas in literal quotes
+        if isinstance(value, str):
+            row[column] = value.strip().strip('"').strip() or None
+    # Stored as naive UTC
+    row["FiledDate"] = pd.Timestamp(row["FiledDate"]).tz_convert(None).to_pydatetime()
+    return row
+
+
+def _write(session, statement, rows):
+    session.execute(statement, rows)
+    session.commit()
+
+
+def ingest(path=REPORT_PATH, full=False, batch_rows=BATCH_ROWS, connection=None):
+    """Upsert filings from the report into telecom_filings by Filing Number.
+
+    Only filings at or after the newest Filed Date already stored are written, unless full
+    is set, e.g. to pick up corrections to older filings.
+    """
+    connection = connection or get_connection()
+    upsert = dialect_statement(UPSERT_FILING, connection)
+    with connection.session as session:
+        watermark = session.execute(text("SELECT MAX(FiledDate) FROM telecom_filings")).scalar()
+    # Filings sharing the watermark's timestamp may be new, the upsert absorbs the repeats
+    watermark = None if full or watermark is None else pd.Timestamp(watermark).to_pydatetime()
+
+    read = written = 0
+    batch = []
+    with connection.session as session:
+        for record in iter_json_array(path):
+            read += 1
+            row = filing_row(record)
+            if watermark is not None and row["FiledDate"] < watermark:
+                continue
+            batch.append(row)
+            if len(batch) >= batch_rows:
+                _write(session, upsert, batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            _write(session, upsert, batch)
+            written += len(batch)
+
+    if written:
+        invalidate_dataset("telecom_filings_page")
+        invalidate_dataset("telecom_filings_count")
+    logger.info("%d filings read, %d upserted%s", read, written,
+                f" (filed on or after {watermark:%Y-%m-%d %H:%M:%S})" if watermark is not None else "")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description="Stream the HPUC telecom filings report into telecom_filings.")
+    parser.add_argument("path", nargs="?", default=REPORT_PATH)
+    parser.add_argument("--full", action="store_true", help="upsert every filing, ignoring the Filed Date watermark")
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS)
+    args = parser.parse_args()
+    ingest(args.path, full=args.full, batch_rows=args.batch_rows)
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from lazy_imports import lazy_module
+
+go = lazy_module("plotly.graph_objects")
+subplots = lazy_module("plotly.subplots")
+
+# Alternating per column, as the circular progress bars were
+GAUGE_COLORS = ["#0778DF", "#FF3583"]
+ROW_HEIGHT = 190
+
+
+def gauge_matrix(df, row="County", column="Use_pc_internet", value="Estimate_Percent"):
+    """Pivot long rows into a row x column matrix of percentages, keeping first-seen order."""
+    matrix = df.pivot(index=row, columns=column, values=value)
+    matrix = matrix.reindex(index=pd.unique(df[row]), columns=pd.unique(df[column]))
+    return (matrix * 100).round()
+
+
+def gauge_figure(matrix, colors=GAUGE_COLORS, row_height=ROW_HEIGHT):
+    """One plotly figure with a gauge per cell of the matrix, titled "row / column"."""
+    rows, cols = matrix.shape
+    fig = subplots.make_subplots(rows=rows, cols=cols,
+                                 specs=[[{"type": "indicator"}] * cols for _ in range(rows)],
+                                 vertical_spacing=0.25 / max(rows, 1))
+    values = matrix.to_numpy()
+    for r, c in np.ndindex(rows, cols):
+        if np.isnan(values[r, c]):
+            continue
+        fig.add_trace(go.Indicator(
+            mode="gauge+number",
+            value=values[r, c],
+            number={"suffix": "%", "valueformat": ".0f"},
+            title={"text": f"<b>{matrix.index[r]}</b><br><span style='font-size:0.8em'>{matrix.columns[c]}</span>",
+                   "font": {"size": 14}},
+            gauge={"axis": {"range": [0, 100], "visible": False},
+                   "bar": {"color": colors[c % len(colors)]},
+                   "bgcolor": "#E8EEF4",
+                   "borderwidth": 0},
+        ), row=r + 1, col=c + 1)
+    fig.update_layout(height=rows * row_height, margin=dict(t=50, b=10, l=20, r=20))
+    return fig
@@ -0,0 +1,160 @@
+import argparse
+import logging
+import os
+import re
+import unicodedata
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Batch enrichment of data/entities.csv. Geocoding runs offline from the dashboard:
+#   python geocode_entities.py                      # offline gazetteer (city centroids)
+#   python geocode_entities.py --zip-centroids FILE # plus ZIP centroids, e.g. the Census ZCTA gazetteer
+#   python geocode_entities.py --backend nominatim  # OpenStreetMap, 1 request per second
+# Results are kept in a persistent cache keyed by normalized address, so only new
+# addresses are ever looked up, and written to ENTITIES_GEOCODED for the Impact page.
+ENTITIES_PATH = "data/entities.csv"
+ENTITIES_GEOCODED = "data/entities_geocoded.csv"
+GEOCODE_CACHE = "data/geocode_cache.csv"
+CITY_CENTROIDS = "data/BroadBandCover_by_City.csv"
+
+ABBREVIATIONS = {
+    "AVENUE": "AVE", "STREET": "ST", "ROAD": "RD", "HIGHWAY": "HWY", "DRIVE": "DR",
+    "PLACE": "PL", "BOULEVARD": "BLVD", "CIRCLE": "CIR", "LANE": "LN", "PARKWAY": "PKWY",
+}
+ABBREVIATION_PATTERN = re.compile(r"\b(" + "|".join(ABBREVIATIONS) + r")\b")
+UNIT_PATTERN = re.compile(r"\b(?:SUITE|STE|BLDG|BUILDING|RM|ROOM|UNIT|APT)\b\s*#?\s*[\w-]*|#\s*[\w-]+")
+# Anything after the ZIP code (ZIP+4, country, notes) is not part of the key
+STATE_ZIP_PATTERN = re.compile(r"^(.*?)[,\s]+(?:HI|HAWAII)\s+(\d{5})(?:-\d{4})?\b")
+
+
+def strip_marks(value):
+    # Drop diacritics and the ʻokina so "Līhuʻe" and "Lihue" compare equal
+    value = unicodedata.normalize("NFKD", str(value))
+    value = "".join(ch for ch in value if not unicodedata.combining(ch))
+    return re.sub(r"[ʻ’'`ʼ]", "", value).upper()
+
+
+def fold_name(value):
+    # Place names also differ in hyphens, e.g. "Kailua-Kona" and "Kailua Kona"
+    return re.sub(r"[\s-]+", " ", strip_marks(value)).strip()
+
+
+def normalize_address(address):
+    """Canonical form of a street address, used as the geocode cache key. Returns None if unusable."""
+    if pd.isna(address):
+        return None
+    address = strip_marks(str(address).replace("\n", ", ").replace(".", ""))
+    address = UNIT_PATTERN.sub("", ABBREVIATION_PATTERN.sub(lambda m: ABBREVIATIONS[m.group(1)], address))
+    address = re.sub(r"\s+", " ", address)
+    match = STATE_ZIP_PATTERN.match(address)
+    if not match:
+        return None
+    street_and_city, zip_code = match.groups()
+    street_and_city = re.sub(r"\s*,[\s,]*", ", ", street_and_city).strip(", ")
+    return f"{street_and_city}, HI {zip_code}"
+
+
+def split_city_zip(address_key):
+    street_and_city, zip_code = STATE_ZIP_PATTERN.match(address_key).groups()
+    return fold_name(street_and_city.split(",")[-1]), zip_code
+
+
+class GazetteerGeocoder:
+    """Offline geocoder resolving an address to its ZIP centroid, else its city centroid."""
+
+    name = "gazetteer"
+
+    def __init__(self, zip_centroids_path=None, city_centroids_path=CITY_CENTROIDS):
+        cities = pd.read_csv(city_centroids_path)
+        self.cities = {fold_name(row.City): (row.Latitude, row.Longitude) for row in cities.itertuples()}
+        self.zips = {}
+        if zip_centroids_path:
+            # Census ZCTA gazetteer layout: tab separated GEOID, INTPTLAT, INTPTLONG
+            zips = pd.read_csv(zip_centroids_path, sep=None, engine="python", dtype={"GEOID": str})
+            zips.columns = zips.columns.str.strip()
+            self.zips = dict(zip(zips["GEOID"].str.zfill(5), zip(zips["INTPTLAT"], zips["INTPTLONG"])))
+
+    def geocode(self, address_key):
+        city, zip_code = split_city_zip(address_key)
+        if zip_code in self.zips:
+            return self.zips[zip_code]
+        if city in self.cities:
+            return self.cities[city]
+        # No comma between street and city, e.g. "4318 RICE ST LIHUE, HI 96766"
+        for name, coordinates in self.cities.items():
+            if city.endswith(" " + name):
+                return coordinates
+        return None
+
+
+class NominatimGeocoder:
+    """OpenStreetMap Nominatim, rate limited to its 1 request per second usage policy."""
+
+    name = "nominatim"
+
+    def __init__(self, user_agent="hawaii-digital-equity-dashboard"):
+        from geopy.extra.rate_limiter import RateLimiter
+        from geopy.geocoders import Nominatim
+
+        self._geocode = RateLimiter(Nominatim(user_agent=user_agent).geocode, min_delay_seconds=1)
+
+    def geocode(self, address_key):
+        location = self._geocode(address_key)
+        return (location.latitude, location.longitude) if location else None
+
+
+def load_cache(path=GEOCODE_CACHE):
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=["AddressKey", "Latitude", "Longitude", "Source"])
+    return pd.read_csv(path)
+
+
+def enrich(geocoder, retry_misses=False):
+    entities = pd.read_csv(ENTITIES_PATH)
+    entities["AddressKey"] = entities["Street Address"].map(normalize_address)
+
+    cache = load_cache()
+    resolved = cache.dropna(subset=["Latitude", "Longitude"])
+    # Known misses are only retried with a different backend or when asked to
+    skip = set(resolved["AddressKey"])
+    if not retry_misses:
+        skip |= set(cache.loc[cache["Source"] == geocoder.name, "AddressKey"])
+
+    pending = entities["AddressKey"].dropna().drop_duplicates()
+    pending = pending[~pending.isin(skip)]
+    results = []
+    for address_key in pending:
+        coordinates = geocoder.geocode(address_key)
+        latitude, longitude = coordinates if coordinates else (None, None)
+        results.append({"AddressKey": address_key, "Latitude": latitude,
+                        "Longitude": longitude, "Source": geocoder.name})
+
+    if results:
+        kept = cache[~cache["AddressKey"].isin(pending)]
+        cache = pd.DataFrame(results) if kept.empty else pd.concat([kept, pd.DataFrame(results)], ignore_index=True)
+        cache.sort_values("AddressKey").to_csv(GEOCODE_CACHE, index=False)
+
+    coordinates = cache.dropna(subset=["Latitude", "Longitude"]).drop_duplicates("AddressKey")
+    enriched = (entities
+                .merge(coordinates[["AddressKey", "Latitude", "Longitude"]], on="AddressKey", how="left")
+                .drop(columns="AddressKey"))
+    enriched.to_csv(ENTITIES_GEOCODED, index=False)
+    logger.info("%d addresses looked up, %d of %d entities have coordinates",
+                len(pending), enriched['Latitude'].notna().sum(), len(enriched))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description="Geocode entities.csv into entities_geocoded.csv.")
+    parser.add_argument("--backend", choices=["gazetteer", "nominatim"], default="gazetteer")
+    parser.add_argument("--zip-centroids", help="ZIP centroid file for the gazetteer backend")
+    parser.add_argument("--retry-misses", action="store_true", help="look up cached misses again")
+    args = parser.parse_args()
+
+    if args.backend == "nominatim":
+        geocoder = NominatimGeocoder()
+    else:
+        geocoder = GazetteerGeocoder(zip_centroids_path=args.zip_centroids)
+    enrich(geocoder, retry_misses=args.retry_misses)
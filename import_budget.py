@@ -0,0 +1,112 @@
+import argparse
+import ast
+import glob
+import json
+import math
+import statistics
+import subprocess
+import sys
+
+# Import time of the app's entry points, measured with python -X importtime and checked against
+# recorded budgets. Only what a script adds on top of the Streamlit runtime is charged to it:
+# the server has these loaded before the first script runs.
+BUDGETS_PATH = "import_budgets.json"
+RUNTIME_MODULES = ["streamlit", "pandas", "numpy"]
+RUNS = 5
+# Recorded budgets leave room for machine noise, and a floor for scripts that import next to nothing
+HEADROOM = 0.3
+MIN_BUDGET = 20
+
+MARKER = "--- entry point imports ---"
+
+
+def entry_points():
+    return ["app.py"] + sorted(glob.glob("pages/*.py"))
+
+
+def import_statements(path):
+    """Source of the module-level import statements of a script."""
+    with open(path, encoding="utf-8") as source:
+        tree = ast.parse(source.read(), filename=path)
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def measure_once(path):
+    """Cumulative import time in ms of a script's imports, and per top-level module."""
+    snippet = "\n".join([
+        f"import {', '.join(RUNTIME_MODULES)}",
+        "import sys",
+        f"sys.stderr.write({MARKER!r} + '\\n')",
+        import_statements(path),
+    ])
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", snippet],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {path} failed:\n{result.stderr[-2000:]}")
+
+    lines = result.stderr.splitlines()
+    modules = {}
+    for line in lines[lines.index(MARKER) + 1:]:
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        # Nested imports are indented below the module that triggered them
+        if name.startswith("  "):
+            continue
+        modules[name.strip()] = int(cumulative) / 1000
+    return sum(modules.values()), modules
+
+
+def measure(path, runs=RUNS):
+    """Median over runs, each in a fresh interpreter."""
+    totals, breakdowns = [], []
+    for _ in range(runs):
+        total, modules = measure_once(path)
+        totals.append(total)
+        breakdowns.append(modules)
+    median = statistics.median(totals)
+    return median, breakdowns[totals.index(min(totals, key=lambda total: abs(total - median)))]
+
+
+def read_budgets(path=BUDGETS_PATH):
+    try:
+        with open(path, encoding="utf-8") as budgets:
+            return json.load(budgets)
+    except FileNotFoundError:
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the import time of app.py and the pages against budgets.")
+    parser.add_argument("paths", nargs="*", help="entry points (default: app.py and pages/*.py)")
+    parser.add_argument("--runs", type=int, default=RUNS)
+    parser.add_argument("--record", action="store_true", help=f"write the measurements plus headroom to {BUDGETS_PATH}")
+    parser.add_argument("--top", type=int, default=0, help="list the N slowest top-level imports of each entry point")
+    args = parser.parse_args()
+
+    budgets = read_budgets()
+    over = []
+    for path in args.paths or entry_points():
+        median, modules = measure(path, args.runs)
+        budget = budgets.get(path)
+        status = "" if budget is None else ("OVER" if median > budget else "ok")
+        print(f"{path:32} {median:8.1f} ms" + ("" if budget is None else f"  budget {budget:6.0f} ms  {status}"))
+        for name, ms in sorted(modules.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"    {name:40} {ms:8.1f} ms")
+        if status == "OVER":
+            over.append(path)
+        if args.record:
+            budgets[path] = max(math.ceil(median * (1 + HEADROOM)), MIN_BUDGET)
+
+    if args.record:
+        with open(BUDGETS_PATH, "w", encoding="utf-8") as out:
+            json.dump(dict(sorted(budgets.items())), out, indent=2)
+            out.write("\n")
+        print(f"Budgets written to {BUDGETS_PATH}")
+    elif over:
+        print(f"Over budget: {', '.join(over)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import importlib
+import sys
+
+
+class LazyModule:
+    """Stand-in for a module, imported on first attribute access.
+
+    For heavy libraries only some cards or pages use: the import cost moves from loading
+    the script to the first chart that needs it, and is skipped when nothing does.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            # The import system's per-module locks make concurrent first uses safe
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_module(name):
+    """The module if it is already imported, else a LazyModule for it."""
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
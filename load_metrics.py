@@ -0,0 +1,103 @@
+import bisect
+import threading
+import time
+from collections import defaultdict
+
+import pandas as pd
+
+# Per-dataset counters of the registry's loads, kept in process memory since the last restart and
+# shown on pages/diagnostics.py. Latencies go into fixed buckets, so recording is O(1) and memory
+# stays constant however much traffic the server sees.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+class DatasetMetrics:
+    """Counters of one dataset. Not thread-safe on its own, LoadMetrics holds the lock."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.rows = 0  # of the last successful load
+        self.bytes = 0
+        self.bytes_loaded = 0  # summed over all loads
+        # One count per bucket of LATENCY_BUCKETS_MS, plus one for anything slower
+        self.latency_counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.latency_total_ms = 0.0
+        self.latency_max_ms = 0.0
+
+    def record_load(self, elapsed_ms, rows=None, size=None):
+        self.misses += 1
+        self.latency_counts[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+        self.latency_total_ms += elapsed_ms
+        self.latency_max_ms = max(self.latency_max_ms, elapsed_ms)
+        if rows is None:
+            self.errors += 1
+        else:
+            self.rows, self.bytes = rows, size
+            self.bytes_loaded += size
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th quantile of load latency, in ms."""
+        loads = sum(self.latency_counts)
+        if not loads:
+            return None
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS + (self.latency_max_ms,), self.latency_counts):
+            seen += count
+            if seen >= q * loads:
+                return min(bound, self.latency_max_ms)
+        return self.latency_max_ms
+
+
+class LoadMetrics:
+    def __init__(self):
+        self._datasets = defaultdict(DatasetMetrics)
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def hit(self, name):
+        with self._lock:
+            self._datasets[name].hits += 1
+
+    def load(self, name, elapsed_ms, rows=None, size=None):
+        """Record a load from the source; rows of None marks a failed one."""
+        with self._lock:
+            self._datasets[name].record_load(elapsed_ms, rows, size)
+
+    def reset(self):
+        with self._lock:
+            self._datasets.clear()
+            self.started = time.time()
+
+    def summary(self):
+        """One row per dataset, slowest p95 first."""
+        with self._lock:
+            rows = [{
+                "dataset": name,
+                "hits": metrics.hits,
+                "misses": metrics.misses,
+                "errors": metrics.errors,
+                "hit_rate": metrics.hits / (metrics.hits + metrics.misses) if metrics.hits + metrics.misses else None,
+                "p50_ms": metrics.percentile(0.5),
+                "p95_ms": metrics.percentile(0.95),
+                "max_ms": metrics.latency_max_ms if metrics.misses else None,
+                "mean_ms": metrics.latency_total_ms / metrics.misses if metrics.misses else None,
+                "rows": metrics.rows,
+                "bytes": metrics.bytes,
+                "bytes_loaded": metrics.bytes_loaded,
+            } for name, metrics in self._datasets.items()]
+        columns = ["dataset", "hits", "misses", "errors", "hit_rate", "p50_ms", "p95_ms", "max_ms", "mean_ms",
+                   "rows", "bytes", "bytes_loaded"]
+        return (pd.DataFrame(rows, columns=columns)
+                .sort_values("p95_ms", ascending=False, na_position="last", ignore_index=True))
+
+    def histogram(self, name):
+        """Load counts of a dataset per latency bucket, labelled by the bucket's upper bound."""
+        labels = [f"≤{bound} ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]} ms"]
+        with self._lock:
+            counts = list(self._datasets[name].latency_counts) if name in self._datasets else [0] * len(labels)
+        return pd.Series(counts, index=labels, name="loads")
+
+
+metrics = LoadMetrics()
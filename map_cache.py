@@ -0,0 +1,60 @@
+import threading
+
+import streamlit.components.v1 as components
+
+from data_registry import BoundedCache, dataset_version, load_dataset
+
+# Rendered folium documents, keyed by the data version and the map parameters
+MAX_MAP_BYTES = 32 * 1024 * 1024
+
+HAWAII_CENTER = (20.5, -157.5)
+
+_map_cache = BoundedCache(MAX_MAP_BYTES)
+_build_lock = threading.Lock()
+
+
+def _build_heatmap(data, center, zoom, value, radius, blur, max_val):
+    # Imported on first build only, the cached path never touches folium
+    import leafmap.foliumap as leafmap
+
+    m = leafmap.Map(center=list(center), zoom=zoom)
+    m.add_heatmap(data=data,
+                  latitude="Latitude",
+                  longitude="Longitude",
+                  value=value,
+                  name="Heat map",
+                  radius=radius,
+                  blur=blur,
+                  max_val=max_val)
+    # to_streamlit adds the layer control before serializing, keep the same document
+    m.add_layer_control()
+    return m.to_html()
+
+
+def heatmap_html(name, params=None, center=HAWAII_CENTER, zoom=7, value="BroadbandCoverage",
+                 radius=15, blur=10, max_val=100):
+    """HTML of a heatmap of a registry dataset, rendered once per data version and parameters.
+
+    params are the dataset's query parameters, e.g. the zoom level and cell range of broadband_bins.
+    """
+    params = params or {}
+    map_params = (tuple(center), zoom, value, radius, blur, max_val)
+    key = (name, tuple(sorted(params.items())), dataset_version(name, **params), map_params)
+    html = _map_cache.get(key)
+    if html is not None:
+        return html
+
+    with _build_lock:
+        html = _map_cache.get(key)
+        if html is None:
+            # Drop rows where coordinates couldn't be found
+            data = load_dataset(name, **params).dropna(subset=["Latitude", "Longitude"])
+            html = _build_heatmap(data, *map_params)
+            # Older versions age out of the LRU, nothing refers to them anymore
+            _map_cache.put(key, html)
+    return html
+
+
+def show_heatmap(name, height=500, **map_params):
+    """Drop-in for leafmap's Map.to_streamlit, serving the cached document."""
+    return components.html(heatmap_html(name, **map_params), height=height)
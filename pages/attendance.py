@@ -1,29 +1,18 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-from streamlit_extras.add_vertical_space import add_vertical_space
 
 from style_helper import apply_custom_style
+from data_registry import load_dataset
+from regression_stats import CONFIDENCE, dataset_fits, regression_plot
+from figure_cache import show_pyplot
 
-@st.cache_data
 def load_and_clean_data():
-  df = pd.read_csv("data/Tbl_RegAttend.csv")
-
-  # Remove completely empty columns (extra commas at the end of CSV)
-  df = df.dropna(axis=1, how='all')
-
-  # Filter to rows where Island == "Total"
-  df = df[df["Island"] == "Total"].copy()
+  return load_dataset("attendance")
 
-  # Clean column names
-  df.columns = df.columns.str.strip().str.replace(' ', '_').str.replace('/', '_')
-  
-  # Convert all columns that can be numeric
-  for col in df.columns:
-    df[col] = pd.to_numeric(df[col], errors='ignore')  # keep strings like 'Island', 'textDate'
-  return df
+def draw_regression(ax, df_total, x_axis, y_axis, fit):
+  regression_plot(ax, df_total, x_axis, y_axis, fit)
+  ax.set_title(f"{y_axis.replace('_', ' ')} vs {x_axis.replace('_', ' ')}")
+  ax.set_xlabel(x_axis.replace('_', ' '))
+  ax.set_ylabel(y_axis.replace('_', ' '))
 
 def main():
   apply_custom_style()
@@ -41,12 +30,13 @@ def main():
   x_axis = st.selectbox("X-axis", numeric_cols, index=default_x)
   y_axis = st.selectbox("Y-axis", numeric_cols, index=default_y)
 
-  fig, ax = plt.subplots()
-  sns.regplot(x=df_total[x_axis], y=df_total[y_axis], ax=ax, scatter_kws={"s": 40})
-  ax.set_title(f"{y_axis.replace('_', ' ')} vs {x_axis.replace('_', ' ')}")
-  ax.set_xlabel(x_axis.replace('_', ' '))
-  ax.set_ylabel(y_axis.replace('_', ' '))
-  st.pyplot(fig)
+  # Every pair is fitted once per data version, switching axes is a lookup
+  fit = dataset_fits("attendance").loc[(x_axis, y_axis)]
+
+  # Each axis pair is rendered once for all sessions until the data changes
+  show_pyplot(draw_regression, df_total, x_axis, y_axis, fit)
+  st.caption(f"r = {fit['r']:.2f}, p = {fit['p']:.3f}, n = {fit['n']:.0f}; "
+             f"shaded: {CONFIDENCE:.0%} confidence band of the fitted line")
 
 if __name__ == "__main__":
   main()
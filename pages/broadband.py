@@ -1,46 +1,34 @@
 import streamlit as st
-import leafmap.foliumap as leafmap
-import pandas as pd
 
 from streamlit_extras.add_vertical_space import add_vertical_space
-from pygwalker.api.streamlit import StreamlitRenderer
 
 from style_helper import apply_custom_style
+from explorer import show_explorer
+from coverage_bins import AREAS, ZOOM_LEVELS, show_coverage_map
 
-@st.cache_data
-def fetch_broadband_data():
-    conn = st.connection('mysql', type='sql')
-    df = conn.query('SELECT City, County, Providers, BroadbandCoverage, Latitude, Longitude FROM broadbcover_by_city', ttl=6)
-    return df
+# Zoom level that fits each area in the map; zooming in further than MAX_ZOOM_IN levels
+# would send cells far outside the visible part of the area
+DEFAULT_ZOOM = {"Statewide": 7, "Kauaʻi": 10, "Oʻahu": 10, "Maui County": 9, "Hawaiʻi Island": 8}
+MAX_ZOOM_IN = 2
 
 def main():
     apply_custom_style()
             
     st.header("Broadband Connectivity Heatmap")
     
-    # Drop rows where coordinates couldn't be found
-    data = fetch_broadband_data()
-    data.dropna(subset=['Latitude', 'Longitude'], inplace=True)
-
-    # Create Leafmap map
-    m = leafmap.Map(center=[20.5, -157.5], zoom=7)  # Center on Hawaii
-
-    # Add heatmap layer
-    m.add_heatmap(data=data,
-                  latitude="Latitude",
-                  longitude="Longitude",
-                  value="BroadbandCoverage",
-                  name="Heat map",
-                  radius=15,
-                  blur=10, 
-                  max_val=100)
-    
-    m.to_streamlit(height=500)
+    # Only the cells of the chosen area at the chosen zoom level are sent to the map
+    col1, col2, col3 = st.columns(3)
+    area = col1.selectbox("Area", list(AREAS), key="broadband_area")
+    zooms = [z for z in ZOOM_LEVELS if DEFAULT_ZOOM[area] <= z <= DEFAULT_ZOOM[area] + MAX_ZOOM_IN]
+    zoom = col2.select_slider("Zoom level", options=zooms, key=f"broadband_zoom_{area}")
+    metric = col3.radio("Coverage", ["MeanCoverage", "MinCoverage"], horizontal=True, key="broadband_metric",
+                        format_func=lambda value: "Mean" if value == "MeanCoverage" else "Lowest")
+    show_coverage_map(zoom=zoom, area=area, metric=metric, height=500)
 
     add_vertical_space(2)
 
-    renderer = StreamlitRenderer(data, spec="./gw_config.json")
-    renderer.explorer()
+    # Cached per data version, charts are computed server-side
+    show_explorer("broadband_by_city")
 
 if __name__ == "__main__":
     main()
@@ -1,65 +1,72 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.ticker as ticker
-
-from streamlit_extras.add_vertical_space import add_vertical_space
 
 from style_helper import apply_custom_style
+from budget_analytics import BURN_WINDOW, TOTAL, budget_rollups, draw_budget_overview
+from figure_cache import show_pyplot
 
-from st_circular_progress import CircularProgress
+MONEY = st.column_config.NumberColumn(format="dollar")
 
-@st.cache_data
-def fetch_budget_data():
-  data = pd.read_csv("data/budget.csv")
+def metrics_view(rollups):
+  st.subheader("Key Metrics")
+  totals = rollups.totals
+  used, budgeted, remaining = (totals[column].to_numpy() for column in ("Used", "Budgeted", "Remaining"))
+  month = totals['Date'].iloc[-1]
 
-  # Clean column names
-  data.columns = data.columns.str.strip().str.replace('/', '_')
-    
-  # Filter out Total rows for per-category breakdown
-  category_data = data[data['Category'] != 'Total']
-  total_data = data[data['Category'] == 'Total']
-  return category_data, total_data
+  # Change against the month before, when there is one
+  def delta(values):
+    return f"{values[-1] - values[-2]:+,.2f}" if len(values) > 1 else None
 
-def metrics_view(total_data):
-  st.subheader("Key Metrics Per Month")
-  for _, row in total_data.iterrows():
-    col1, col2, col3 = st.columns(3)
-    col1.metric(f"{row['Date']} Used", f"${row['Used']:,.2f}")
-    col2.metric(f"{row['Date']} Budgeted", f"${row['Budgeted']:,.2f}")
-    col3.metric(f"{row['Date']} Remaining", f"${row['Remaining']:,.2f}")
+  col1, col2, col3 = st.columns(3)
+  col1.metric(f"{month} Used", f"${used[-1]:,.2f}", delta(used), delta_color="inverse")
+  col2.metric(f"{month} Budgeted", f"${budgeted[-1]:,.2f}", delta(budgeted))
+  col3.metric(f"{month} Remaining", f"${remaining[-1]:,.2f}", delta(remaining))
 
-def monthly_overview(total_data):
-  st.subheader("Monthly Overview")
-  fig, ax = plt.subplots()
-  ax.bar(total_data['Date'], total_data['Budgeted'], label='Budgeted', alpha=0.6)
-  ax.bar(total_data['Date'], total_data['Used'], label='Used')
-  ax.set_ylabel("Amount ($)")
-  ax.set_title("Total Budget vs Used")
-  ax.legend()
+  burn = rollups.burn.loc[TOTAL]
+  col1, col2, col3 = st.columns(3)
+  col1.metric(f"Monthly burn ({BURN_WINDOW}-month average)", f"${burn['BurnRate']:,.2f}")
+  col2.metric("Months of budget left", "-" if pd.isna(burn['RunsOut']) else f"{burn['MonthsLeft']:.1f}")
+  col3.metric("Runs out", "-" if pd.isna(burn['RunsOut']) else burn['RunsOut'].strftime("%b %Y"))
+
+  with st.expander("All months"):
+    st.dataframe(totals.set_index('Date'), column_config={
+      "Used": MONEY, "Budgeted": MONEY, "Remaining": MONEY,
+      "CumulativeUsed": st.column_config.NumberColumn("Cumulative used", format="dollar"),
+    })
 
-  # Format y-axis as $20K, $40K, etc.
-  ax.yaxis.set_major_formatter(ticker.FuncFormatter(lambda x, _: f"${int(x/1000)}K"))
+def monthly_overview(rollups):
+  st.subheader("Monthly Overview")
+  show_pyplot(draw_budget_overview, rollups.totals)
 
-  st.pyplot(fig)
+def burn_rate_view(rollups):
+  st.subheader("Remaining Budget Projection")
+  # Reported remaining budget, then the projection at the current burn rate from the latest month on
+  actual = rollups.totals['Remaining']
+  projected = pd.concat([actual.iloc[-1:], rollups.projection['Remaining']])
+  st.line_chart(pd.DataFrame({"Remaining": actual, "Projected": projected}))
+  st.dataframe(rollups.burn, column_config={
+    "Remaining": MONEY,
+    "BurnRate": st.column_config.NumberColumn("Monthly burn", format="dollar"),
+    "MonthsLeft": st.column_config.NumberColumn("Months left", format="%.1f"),
+    "RunsOut": st.column_config.DateColumn("Runs out", format="MMM YYYY"),
+  })
 
-def category_breakdown(category_data):
+def category_breakdown(rollups):
   st.subheader("Category Breakdown")
-  categories = category_data['Category'].unique()
-  selected_category = st.selectbox("Select Category", categories)
+  selected_category = st.selectbox("Select Category", rollups.categories)
+
+  st.line_chart(rollups.category(selected_category)[['Used', 'Budgeted']])
 
-  filtered = category_data[category_data['Category'] == selected_category]
-  st.line_chart(filtered.set_index('Date')[['Used', 'Budgeted']])
-  
 def main():
   apply_custom_style()
-  
+
   st.header("Budget Data Visualization")
 
-  category_data, total_data = fetch_budget_data()
-  metrics_view(total_data)
-  monthly_overview(total_data)
-  category_breakdown(category_data)
+  rollups = budget_rollups()
+  metrics_view(rollups)
+  monthly_overview(rollups)
+  burn_rate_view(rollups)
+  category_breakdown(rollups)
 
 if __name__ == "__main__":
   main()
@@ -1,61 +1,58 @@
 import streamlit as st
-import pandas as pd
 
-from pygwalker.api.streamlit import StreamlitRenderer
-from streamlit_extras.add_vertical_space import add_vertical_space
 from style_helper import apply_custom_style
-from st_circular_progress import CircularProgress
-
-@st.cache_data
-def fetch_usage_data():
-    conn = st.connection('mysql', type='sql')
-    df = conn.query("""SELECT Use_pc_internet, County, Estimate, Estimate_Perccent, Margin_Error, Margin_Error_Percent 
-        FROM use_pc_internet_by_county""", ttl=6)
-    return df
+from gauges import gauge_figure, gauge_matrix
+from data_registry import load_dataset
+from explorer import show_explorer
+from figure_cache import plotly_figure
+from lazy_imports import lazy_module
+
+px = lazy_module("plotly.express")
+
+def fetch_usage_rates():
+    # Derived in-process from the usage_by_county frame the explorer below and the landing page share
+    return load_dataset("usage_rates")
+
+def fetch_acs_catalog():
+    return load_dataset("acs_catalog")
+
+def fetch_acs_variable(variable):
+    # Every county and year of one variable, a primary key range read
+    return load_dataset("acs_variable", variable=variable)
+
+def show_acs_variable():
+    st.write("### Other ACS 5-year estimates")
+    catalog = fetch_acs_catalog()
+    labels = dict(zip(catalog['Variable'], catalog['Section'].str.title() + " / " + catalog['Label']))
+    variable = st.selectbox("Variable", list(labels), index=list(labels).index("DP02_0154") if "DP02_0154" in labels else 0,
+                            format_func=lambda v: f"{v}: {labels[v]}", key="acs_variable")
+
+    df = fetch_acs_variable(variable)
+    latest = df[df['YearRecord'] == df['YearRecord'].max()]
+    # Shares of a universe are shown as rates, totals, medians and means as estimates
+    is_share = latest['Rate'].notna().any() and latest['Rate'].lt(1).any()
+    measure, error = ("Rate", "RateMOE") if is_share else ("Estimate", "EstimateMOE")
+    fig = px.bar(latest, x="County", y=measure, error_y=error, title=labels[variable])
+    if measure == "Rate":
+        fig.update_yaxes(tickformat=".0%")
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption("Error bars are 90% margins of error. A coefficient of variation (CV) above 0.3 marks an unreliable estimate.")
+    st.dataframe(df, hide_index=True)
 
 def main():
     apply_custom_style()
     st.header("Internet Usage by County")
 
-    df = fetch_usage_data()
-    # Filter out rows where "Use_pc_internet" is "Total households"
-    df_filtered = df[df['Use_pc_internet'] != 'Total households']
+    df = fetch_usage_rates()
 
-    # Reorder df_filtered so "HawaiiState" appears first in the "County" column
-    df_filtered = pd.concat([
-        df_filtered[df_filtered['County'] == "HawaiiState"],
-        df_filtered[df_filtered['County'] != "HawaiiState"]
-    ])
+    # One figure for every county and variable, pivoted once; HawaiiState comes first from the query
+    matrix = gauge_matrix(df, value='Estimate_Perccent')
+    st.plotly_chart(plotly_figure(gauge_figure, matrix), use_container_width=True)
 
-    # Group by county and display each type in two columns for each county
-    for county, group in df_filtered.groupby("County", sort=False):
-        st.write(f"### {county}")  # Display the county name as a section header
-    
-        # Create two columns for displaying progress bars side by side
-        col1, col2 = st.columns(2)
-        
-        for i, (_, row) in enumerate(group.iterrows()):
-            # Alternate between columns for each type of internet usage
-            if i % 2 == 0:
-                col = col1
-                color = "#0778DF"
-            else:
-                col = col2
-                color = "#FF3583"
-
-            percentage = int(row['Estimate_Perccent'] * 100)
-
-            # Display the type of internet usage and the progress bar
-            with col:
-                cp = CircularProgress(
-                        label=row['Use_pc_internet'],
-                        value=percentage,
-                        color=color,
-                        key=f"cell_{i}_{col}")
-                cp.st_circular_progress()
-
-    renderer = StreamlitRenderer(df, spec="./gw_config.json")
-    renderer.explorer()
+    show_acs_variable()
+
+    # Cached per data version, charts are computed server-side
+    show_explorer("usage_by_county")
     
 if __name__ == "__main__":
     main()
@@ -0,0 +1,90 @@
+import hmac
+import os
+import time
+
+import streamlit as st
+
+from style_helper import apply_custom_style
+from data_registry import cache_stats, db_backend, invalidate_dataset, load_dataset
+from load_metrics import metrics
+
+# Shown only to whoever knows the password: [diagnostics] password in the secrets, or the
+# DIAGNOSTICS_PASSWORD environment variable. Without either the page stays locked.
+def diagnostics_password():
+    try:
+        password = st.secrets.get("diagnostics", {}).get("password")
+    except FileNotFoundError:
+        password = None
+    return password or os.environ.get("DIAGNOSTICS_PASSWORD")
+
+def unlocked():
+    if st.session_state.get("diagnostics_unlocked"):
+        return True
+    expected = diagnostics_password()
+    if not expected:
+        st.info("Diagnostics are disabled: set [diagnostics] password in the secrets to enable them.")
+        return False
+    entered = st.text_input("Password", type="password")
+    if entered and hmac.compare_digest(entered.encode(), expected.encode()):
+        st.session_state["diagnostics_unlocked"] = True
+        return True
+    if entered:
+        st.error("Wrong password")
+    return False
+
+def show_loads():
+    st.subheader("Dataset loads")
+    cache = cache_stats()
+    st.caption(f"Since {time.strftime('%Y-%m-%d %H:%M', time.localtime(metrics.started))} · "
+               f"backend {db_backend()} · registry cache {cache['entries']} entries, "
+               f"{cache['bytes'] / 2**20:.1f} of {cache['max_bytes'] / 2**20:.0f} MB")
+
+    summary = metrics.summary()
+    if summary.empty:
+        st.write("No dataset loaded yet.")
+        return
+    st.dataframe(summary, hide_index=True, column_config={
+        "hit_rate": st.column_config.NumberColumn("hit rate", format="percent"),
+        "p50_ms": st.column_config.NumberColumn("p50 ms", format="%.0f"),
+        "p95_ms": st.column_config.NumberColumn("p95 ms", format="%.0f"),
+        "max_ms": st.column_config.NumberColumn("max ms", format="%.0f"),
+        "mean_ms": st.column_config.NumberColumn("mean ms", format="%.1f"),
+        "bytes": st.column_config.NumberColumn("bytes", format="compact"),
+        "bytes_loaded": st.column_config.NumberColumn("bytes loaded", format="compact"),
+    })
+
+    # Latency buckets are upper bounds; p50/p95 above are read off the same buckets
+    name = st.selectbox("Latency histogram", summary["dataset"])
+    st.bar_chart(metrics.histogram(name))
+
+    if st.button("Reset counters"):
+        metrics.reset()
+        st.rerun()
+
+def show_table_sizes():
+    st.subheader("Tables")
+    try:
+        sizes = load_dataset("table_sizes")
+    except Exception as e:
+        st.warning(f"Couldn't read table sizes: {e}")
+        return
+    st.dataframe(sizes, hide_index=True, column_config={
+        "DataBytes": st.column_config.NumberColumn("data bytes", format="compact"),
+        "IndexBytes": st.column_config.NumberColumn("index bytes", format="compact"),
+    })
+    if st.button("Refresh table sizes"):
+        invalidate_dataset("table_sizes")
+        st.rerun()
+
+def main():
+    apply_custom_style()
+
+    st.header("Diagnostics")
+
+    if not unlocked():
+        return
+    show_loads()
+    show_table_sizes()
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,17 @@
 import streamlit as st
 import pandas as pd
-import streamlit_shadcn_ui as ui
-import plotly.express as px
 
 from streamlit_extras.add_vertical_space import add_vertical_space
-from pygwalker.api.streamlit import StreamlitRenderer
 from style_helper import apply_custom_style
+from data_registry import load_dataset
+from explorer import show_explorer
+from lazy_imports import lazy_module
+
+ui = lazy_module("streamlit_shadcn_ui")
+px = lazy_module("plotly.express")
 
-@st.cache_data
 def fetch_readiness_data():
-    conn = st.connection('mysql', type='sql')
-    df = conn.query('SELECT Dimension, Details, Unprepared, Old_Guard, Social_Users, Technical, Digital FROM readiness_by_dimensions', ttl=6)
-    return df
+    return load_dataset("readiness_by_dimensions")
 
 def get_page_style():
     # Define the style for the page
@@ -132,8 +132,8 @@ def main():
         * Skilled in digital creativity
         """)
 
-    renderer = StreamlitRenderer(df, spec="./gw_config.json")
-    renderer.explorer()
+    # Cached per data version, charts are computed server-side
+    show_explorer("readiness_by_dimensions")
     
 if __name__ == "__main__":
     main()
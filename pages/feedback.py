@@ -1,48 +1,15 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-
-from sqlalchemy.sql import text
 
 from style_helper import apply_custom_style
+from data_registry import load_dataset
+from feedback_store import enqueue_feedback
+from lazy_imports import lazy_module
 
-def fetch_feedback_data():
-    conn = st.connection('mysql', type='sql')
-    df = conn.query("""
-        SELECT
-            SUM(Satisfied) AS Satisfied,
-            SUM(Unsatisfied) AS Unsatisfied
-        FROM user_feedback;
-        """, ttl=6)
-    return df
-
-# Function to insert feedback into the database
-def insert_feedback(username, email, comments, satisfied):
-    connection = st.connection('mysql', type='sql')
-    
-    # Map satisfied input to binary values
-    satisfied_val = 1 if satisfied == "Yes" else 0
-    unsatisfied_val = 1 if satisfied == "No" else 0
+px = lazy_module("plotly.express")
 
-    # Default username to "Nobody" if empty
-    username = username if username else "Nobody"
-
-    # Use session for transaction management
-    with connection.session as session:
-        insert_query = text("""
-        INSERT INTO user_feedback (UserName, Email, Comments, Satisfied, Unsatisfied)
-        VALUES (:username, :email, :comments, :satisfied_val, :unsatisfied_val)
-        """)
-        
-        # Execute the query with parameters using session
-        session.execute(insert_query, {
-            "username": username,
-            "email": email,
-            "comments": comments,
-            "satisfied_val": satisfied_val,
-            "unsatisfied_val": unsatisfied_val
-        })
-        session.commit()
+def fetch_feedback_data():
+    return load_dataset("feedback_totals")
 
 def main():
     apply_custom_style()
@@ -74,8 +41,8 @@ def main():
     # Entry form for new feedback
     st.header("Submit New Feedback")
     with st.form(key="feedback_form"):
-        username = st.text_input("Name (optional)", value="", help="Enter your name.")
-        email = st.text_input("Email (required)", value="", help="Please enter your email address.")
+        username = st.text_input("Name (optional)", value="", max_chars=100, help="Enter your name.")
+        email = st.text_input("Email (required)", value="", max_chars=250, help="Please enter your email address.")
         satisfied = st.radio("Are you satisfied (required)?", options=["", "Yes", "No"], index=0, help="Select 'Yes' for satisfied or 'No' for unsatisfied.")
         comments = st.text_area("Comments (optional)", help="Enter any additional comments.")
         
@@ -89,7 +56,7 @@ def main():
             elif not satisfied:
                 st.error("Please select 'Yes' or 'No' to indicate if you are satisfied.")
             else:
-                insert_feedback(username, email, comments, satisfied)
+                enqueue_feedback(username, email, comments, satisfied)
                 st.success("Thank you for your feedback!")
                 st.balloons()
 
@@ -1,62 +1,45 @@
 import streamlit as st
-import pandas as pd
-from geopy.geocoders import Nominatim
-from geopy.extra.rate_limiter import RateLimiter
-
-from streamlit_extras.dataframe_explorer import dataframe_explorer
 
 from style_helper import apply_custom_style
+from data_registry import load_dataset, dataset_version
+from entity_index import EntityIndex
+
+@st.cache_resource(max_entries=2)
+def get_entity_index(version):
+    # Rebuilt only when the inventory's content changes, shared by all sessions
+    return EntityIndex(load_dataset("entities"))
+
+def facet_filter(index, label, facet, counts):
+    return st.multiselect(label, index.labels[facet], key=f"impact_{facet}",
+                          format_func=lambda value: f"{value} ({counts[value]})")
 
 def main():
     apply_custom_style()
-            
+
     st.header("Initiatives Impact")
 
-    # Initialize Nominatim API
-    geolocator = Nominatim(user_agent="geoapiExercises")
-    
-    # Set up rate limiter to avoid overloading the API
-    geocode = RateLimiter(geolocator.geocode, min_delay_seconds=1)
-    
-    # Load CSV file into a DataFrame
-    input_csv = 'data/entities.csv'  # Path to your CSV file
-    df = pd.read_csv(input_csv)
-    
-    # Ensure there is a 'Street Address' column in your CSV
-    if 'Street Address' not in df.columns:
-        raise ValueError("The CSV file must have a 'Street Address' column")
-    
-    # Create new columns for latitude and longitude if they don’t exist
-    if 'Latitude' not in df.columns:
-        df['Latitude'] = None
-    if 'Longitude' not in df.columns:
-        df['Longitude'] = None
-
-    # Counter to limit the number of geocoding attempts
-    max_attempts = 5
-    attempt_count = 0    
-    
-    # Geocode each address
-    for index, row in df.iterrows():
-        # Stop if max geocoding attempts have been reached
-        if attempt_count >= max_attempts:
-            # st.write("Reached maximum geocoding attempts. Stopping geocoding.")
-            break
-        
-        if pd.notnull(row['Latitude']) and pd.notnull(row['Longitude']):
-            continue  # Skip if coordinates already exist
-        
-        try:
-            # location = geocode(row['Street Address'])
-            attempt_count += 1  # Increment attempt count regardless of success
-
-            # if location:
-            #    df.at[index, 'Latitude'] = location.latitude
-            #    df.at[index, 'Longitude'] = location.longitude
-        except Exception as e:
-            st.error(f"Error geocoding address at index {index}: {e}")
-
-    filtered_df = dataframe_explorer(df, case=False)
+    # Coordinates are precomputed offline by geocode_entities.py, nothing is geocoded per request
+    df = load_dataset("entities")
+    index = get_entity_index(dataset_version("entities"))
+
+    # Facet filters are bit operations on the prebuilt index, counts are for the whole inventory
+    everything = index.match()
+    col1, col2 = st.columns(2)
+    with col1:
+        pillars = facet_filter(index, "Digital equity pillars (all of)", "pillar", index.facet_counts("pillar", everything))
+        capabilities = facet_filter(index, "Capabilities (all of)", "capability", index.facet_counts("capability", everything))
+    with col2:
+        counties = facet_filter(index, "County served (any of)", "county", index.facet_counts("county", everything))
+        types = facet_filter(index, "Type of entity (any of)", "type", index.facet_counts("type", everything))
+    include_statewide = st.checkbox("Include statewide entities in county results", value=True)
+
+    filtered_df = index.query(df, pillars=pillars, capabilities=capabilities, counties=counties,
+                              types=types, include_statewide=include_statewide)
+
+    located = filtered_df.dropna(subset=['Latitude', 'Longitude'])
+    st.map(located, latitude='Latitude', longitude='Longitude')
+    st.caption(f"{len(filtered_df)} of {len(df)} entities match, {len(located)} located by street address")
+
     st.dataframe(filtered_df, use_container_width=True)
 
 if __name__ == "__main__":
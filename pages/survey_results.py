@@ -1,7 +1,10 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 from style_helper import apply_custom_style
+from data_registry import load_dataset
+from lazy_imports import lazy_module
+
+px = lazy_module("plotly.express")
 
 apply_custom_style()
 st.header("Survey Results: Digital Literacy Classes")
@@ -13,8 +16,8 @@ This page provides a detailed breakdown of survey results from two digital liter
 """)
 
 # Load data
-class3 = pd.read_excel("data/SurveyClass3.xlsx", engine="openpyxl")
-class4 = pd.read_excel("data/SurveyClass4.xlsx", engine="openpyxl")
+class3 = load_dataset("survey_class3")
+class4 = load_dataset("survey_class4")
 
 # Remove N row for display and plotting
 class3_no_n = class3[class3[class3.columns[0]] != 'N']
@@ -0,0 +1,165 @@
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data_registry import dataset_version, load_dataset
+
+# Two-sided confidence level of the band around each fit, as seaborn's regplot default
+CONFIDENCE = 0.95
+BAND_POINTS = 100
+
+FIT_COLUMNS = ["n", "slope", "intercept", "r", "p", "x_mean", "sxx", "resid_se", "t_crit"]
+
+
+def _betacf(a, b, x, max_iter=200, eps=3e-14):
+    # Continued fraction of the incomplete beta function (modified Lentz)
+    tiny = 1e-300
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c, d = 1.0, 1.0 - qab * x / qap
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, max_iter + 1):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < eps:
+            break
+    return h
+
+
+def betainc(a, b, x):
+    """Regularized incomplete beta function I_x(a, b)."""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                     + a * math.log(x) + b * math.log1p(-x))
+    # The continued fraction converges fast on one side of the mean, use the symmetry on the other
+    if x < (a + 1.0) / (a + b + 2.0):
+        return front * _betacf(a, b, x) / a
+    return 1.0 - front * _betacf(b, a, 1.0 - x) / b
+
+
+def t_sf2(t, df):
+    """Two-sided tail probability P(|T| >= |t|) of Student's t with df degrees of freedom."""
+    if not np.isfinite(t):
+        return 0.0 if not np.isnan(t) else np.nan
+    return betainc(df / 2.0, 0.5, df / (df + t * t))
+
+
+def t_ppf2(confidence, df):
+    """Critical value t* with P(|T| <= t*) = confidence, by bisection on t_sf2."""
+    alpha = 1.0 - confidence
+    low, high = 0.0, 1.0
+    while t_sf2(high, df) > alpha:
+        high *= 2.0
+    for _ in range(100):
+        mid = (low + high) / 2.0
+        if t_sf2(mid, df) > alpha:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2.0
+
+
+def pairwise_fits(df, columns=None, confidence=CONFIDENCE):
+    """Least-squares fits of every numeric column on every other, one row per (x, y) pair.
+
+    Uses the rows where both columns are present. Slope, intercept and r come from the
+    pairwise sums in closed form; p tests slope = 0, and resid_se, sxx and t_crit give the
+    confidence band of the fitted line (see band).
+    """
+    if columns is None:
+        columns = df.select_dtypes(include="number").columns.tolist()
+    values = df[columns].to_numpy(dtype=float, na_value=np.nan)
+    present = ~np.isnan(values)
+    mask = present.astype(float)
+    x = np.where(present, values, 0.0)
+
+    # [i, j] sums over the rows where columns i and j are both present
+    n = mask.T @ mask
+    sum_x = x.T @ mask
+    sum_y = sum_x.T
+    sum_xx = (x * x).T @ mask
+    sum_yy = sum_xx.T
+    sum_xy = x.T @ x
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_mean = sum_x / n
+        sxx = sum_xx - sum_x * x_mean
+        syy = sum_yy - sum_y * sum_y / n
+        sxy = sum_xy - sum_x * sum_y / n
+        slope = sxy / sxx
+        intercept = sum_y / n - slope * x_mean
+        r = np.clip(sxy / np.sqrt(sxx * syy), -1.0, 1.0)
+        dof = n - 2
+        resid_se = np.sqrt(np.maximum(syy - slope * sxy, 0.0) / dof)
+        t_stat = r * np.sqrt(dof / (1.0 - r * r))
+
+    # One t-distribution lookup per distinct sample size, not per pair
+    t_crit = np.full(n.shape, np.nan)
+    p = np.full(n.shape, np.nan)
+    for size in np.unique(n[n > 2]):
+        t_crit[n == size] = t_ppf2(confidence, size - 2)
+    for index in zip(*np.nonzero((n > 2) & np.isfinite(r))):
+        p[index] = t_sf2(t_stat[index], n[index] - 2)
+
+    index = pd.MultiIndex.from_product([columns, columns], names=["x", "y"])
+    fits = pd.DataFrame({
+        "n": n.ravel().astype(int),
+        "slope": slope.ravel(),
+        "intercept": intercept.ravel(),
+        "r": r.ravel(),
+        "p": p.ravel(),
+        "x_mean": x_mean.ravel(),
+        "sxx": sxx.ravel(),
+        "resid_se": resid_se.ravel(),
+        "t_crit": t_crit.ravel(),
+    }, index=index)
+    return fits[FIT_COLUMNS]
+
+
+def band(fit, x_values):
+    """Fitted line and the lower/upper confidence band of the mean response at x_values."""
+    x_values = np.asarray(x_values, dtype=float)
+    fitted = fit["intercept"] + fit["slope"] * x_values
+    half_width = fit["t_crit"] * fit["resid_se"] * np.sqrt(1.0 / fit["n"] + (x_values - fit["x_mean"]) ** 2 / fit["sxx"])
+    return fitted, fitted - half_width, fitted + half_width
+
+
+@st.cache_resource(max_entries=8)
+def _get_fits(name, params, version):
+    return pairwise_fits(load_dataset(name, **dict(params)))
+
+
+def dataset_fits(name, **params):
+    """Pairwise fits of a registry dataset's numeric columns, computed once per data version."""
+    return _get_fits(name, tuple(sorted(params.items())), dataset_version(name, **params))
+
+
+def regression_plot(ax, df, x, y, fit, points=BAND_POINTS):
+    """Scatter of df[x] vs df[y] with the precomputed fit and its confidence band, as sns.regplot draws it."""
+    color = "C0"
+    ax.scatter(df[x], df[y], s=40, color=color, alpha=0.8)
+    # x and y may be the same column
+    x_values = df[x][df[x].notna() & df[y].notna()]
+    if fit["n"] > 2 and np.isfinite(fit["slope"]) and len(x_values):
+        grid = np.linspace(x_values.min(), x_values.max(), points)
+        fitted, lower, upper = band(fit, grid)
+        ax.plot(grid, fitted, color=color)
+        ax.fill_between(grid, lower, upper, color=color, alpha=0.15, linewidth=0)
+    return ax
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+
+import pandas as pd
+import pyarrow.feather as feather
+
+# Columnar copies of slow-to-parse source files, keyed by the source's mtime and content hash
+# and by the options it was parsed with
+SIDECAR_DIR = "data/.cache"
+
+READERS = {"excel": pd.read_excel, "csv": pd.read_csv}
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        for block in iter(lambda: source.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _options_hash(reader, read_options):
+    # Changing the declared schema (dtypes, usecols, engine) must not reuse an old parse
+    encoded = json.dumps([reader, read_options or {}], sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()[:8]
+
+
+def _manifest_path(path):
+    return os.path.join(SIDECAR_DIR, os.path.basename(path) + ".json")
+
+
+def _read_manifest(path):
+    try:
+        with open(_manifest_path(path), encoding="utf-8") as manifest:
+            return json.load(manifest)
+    except (OSError, ValueError):
+        return {}
+
+
+def _tmp_path(target):
+    # Unique per writer, so concurrent conversions never interleave in one file
+    return f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _write_json(target, content):
+    tmp_path = _tmp_path(target)
+    with open(tmp_path, "w", encoding="utf-8") as out:
+        json.dump(content, out)
+    os.replace(tmp_path, target)
+
+
+def sidecar_path(path, read_options=None, reader="excel"):
+    """Return the Feather sidecar for a data file, converting it first if it is stale.
+
+    reader is "excel" or "csv"; read_options are passed to the matching pandas reader.
+    """
+    stat = os.stat(path)
+    manifest = _read_manifest(path)
+    options_hash = _options_hash(reader, read_options)
+
+    # Unchanged mtime, size and options: trust the manifest without rehashing the file
+    if (manifest.get("mtime_ns") == stat.st_mtime_ns and manifest.get("size") == stat.st_size
+            and manifest.get("options") == options_hash and os.path.exists(manifest.get("sidecar", ""))):
+        return manifest["sidecar"]
+
+    source_hash = _file_hash(path)
+    sidecar = os.path.join(SIDECAR_DIR, f"{os.path.basename(path)}.{source_hash[:16]}.{options_hash}.feather")
+    if not os.path.exists(sidecar):
+        os.makedirs(SIDECAR_DIR, exist_ok=True)
+        df = READERS[reader](path, **(read_options or {}))
+        # Feather needs string column names; the survey sheets use dates as headers
+        df.columns = [str(col) for col in df.columns]
+        tmp_path = _tmp_path(sidecar)
+        # Uncompressed so readers can memory-map the columns without decoding them
+        feather.write_feather(df.reset_index(drop=True), tmp_path, compression="uncompressed")
+        os.replace(tmp_path, sidecar)
+
+        # Drop the sidecar of the previous version of the file
+        previous = manifest.get("sidecar")
+        if previous and previous != sidecar and os.path.exists(previous):
+            os.remove(previous)
+
+    _write_json(_manifest_path(path), {
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": source_hash,
+        "options": options_hash,
+        "sidecar": sidecar,
+    })
+    return sidecar
+
+
+def _read_sidecar(sidecar):
+    # Categoricals and nullable integers round-trip through the Arrow schema's pandas metadata
+    return feather.read_table(sidecar, memory_map=True).to_pandas()
+
+
+def read_excel_cached(path, **read_excel_options):
+    """pd.read_excel replacement that memory-maps a Feather sidecar instead of parsing the workbook."""
+    return _read_sidecar(sidecar_path(path, read_excel_options, reader="excel"))
+
+
+def read_csv_cached(path, **read_csv_options):
+    """pd.read_csv replacement that memory-maps a Feather sidecar instead of parsing the file."""
+    return _read_sidecar(sidecar_path(path, read_csv_options, reader="csv"))
+
+
+if __name__ == "__main__":
+    # Pre-build sidecars, e.g. at deploy time: python sidecar_cache.py data/*.xlsx
+    # (CSV files with a declared schema are built by the registry on first load)
+    for workbook in sys.argv[1:]:
+        print(f"{workbook} -> {sidecar_path(workbook, {'engine': 'openpyxl'})}")
@@ -1,13 +1,51 @@
+import base64
+import json
+import mimetypes
+import os
+from functools import lru_cache
+
 import streamlit as st
 
+# Built by build_assets.py, served from static/ by Streamlit (server.enableStaticServing)
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_MANIFEST = os.path.join(REPO_DIR, "static", "manifest.json")
+
+@lru_cache(maxsize=1)
+def _static_manifest():
+  try:
+    with open(STATIC_MANIFEST, encoding="utf-8") as manifest:
+      return json.load(manifest)
+  except (OSError, ValueError):
+    return {}
+
+@lru_cache(maxsize=16)
+def _inline_image(source):
+  with open(os.path.join(REPO_DIR, source), "rb") as image:
+    content = base64.b64encode(image.read()).decode("ascii")
+  return f"data:{mimetypes.guess_type(source)[0]};base64,{content}"
+
+def asset_url(source):
+  """URL of the optimized build of a repo image, or the original inlined if it wasn't built."""
+  built = _static_manifest().get("images", {}).get(source)
+  return f"app/{built}" if built else _inline_image(source)
+
+def font_faces():
+  # Self-hosted Montserrat from static/fonts, an installed copy wins
+  fonts = _static_manifest().get("fonts", {})
+  return "\n".join(f"""
+  @font-face {{
+      font-family: 'Montserrat';
+      font-style: normal;
+      font-weight: {weight};
+      font-display: swap;
+      src: local('Montserrat'), url('app/{path}') format('woff2');
+  }}""" for weight, path in sorted(fonts.items()))
+
 def apply_custom_style(suppress_anchor=False):
   st.set_page_config(layout="wide")
   
   # Define the HTML and CSS
-  html_content = """
-  <style>
-  @import url('https://fonts.googleapis.com/css2?family=Montserrat:wght@400;700&display=swap');
-  
+  html_content = "<style>" + font_faces() + """
   /* Set Montserrat as the default font */
   body {
       font-family: 'Montserrat', sans-serif;
@@ -102,7 +140,7 @@ def apply_custom_style(suppress_anchor=False):
     }
   }
   </style>
-  
+  """ + f"""
   <div class="e2_21">
       <div class="header-text-container">
           <div class="e1_15">DIGITAL EQUITY DASHBOARD</div>
@@ -111,7 +149,7 @@ def apply_custom_style(suppress_anchor=False):
       </div>
       <div class="header-image">
           <a href="./" target="_self">
-              <img src="https://raw.githubusercontent.com/datjandra/Team-Pu-u-Kukui/refs/heads/main/images/Aloha_white2.png" alt="Header Image">
+              <img src="{asset_url('images/Aloha_white2.png')}" alt="Header Image">
           </a>
       </div>
   </div>
@@ -121,11 +159,11 @@ def apply_custom_style(suppress_anchor=False):
   st.markdown(html_content, unsafe_allow_html=True)
 
   if not suppress_anchor:
-    image_anchor = """
+    image_anchor = f"""
     <!-- Left-aligned image anchor at the bottom -->
     <div class="bottom-left-image-container">
         <a href="./" target="_self">
-            <img src="https://raw.githubusercontent.com/datjandra/Team-Pu-u-Kukui/refs/heads/main/images/arrow-left-s-line.png" alt="Bottom Left Image" width="50px">
+            <img src="{asset_url('images/arrow-left-s-line.png')}" alt="Bottom Left Image" width="50px">
         </a>
     </div>
     """
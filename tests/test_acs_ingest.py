@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+import acs_ingest
+
+# Published percents are rounded to one decimal place of a percent
+PERCENT_ROUNDING = 0.0005
+
+
+@pytest.fixture(scope="module")
+def estimates():
+    return acs_ingest.read_workbook(acs_ingest.WORKBOOK_PATH, 2022)
+
+
+def test_rates_match_published_percents(estimates):
+    shares = estimates[estimates["Percent"].notna()]
+    assert set(shares["TableId"]) == {"DP02", "DP03", "DP04", "DP05"}
+    for table, rows in shares.groupby("TableId"):
+        off = rows[~(np.abs(rows["Rate"] - rows["Percent"]) <= PERCENT_ROUNDING + 1e-9)]
+        assert off.empty, f"{table}: {len(off)} rates differ from the percents, e.g.\n{off.head().to_string()}"
+
+
+def test_sub_universe_denominators(estimates):
+    # Females in the labor force are a share of females 16 and over, not of everyone 16 and over
+    row = estimates[(estimates["Variable"] == "DP03_0011") & (estimates["County"] == acs_ingest.STATE)].iloc[0]
+    assert row["Rate"] == pytest.approx(0.603, abs=PERCENT_ROUNDING)
+    assert row["RateMOE"] == pytest.approx(row["PercentMOE"], abs=0.001)
+
+
+def test_non_shares_have_no_rate(estimates):
+    medians = estimates[estimates["Label"].str.startswith("Median household income")]
+    assert not medians.empty
+    assert medians["Rate"].isna().all()
@@ -0,0 +1,34 @@
+import pandas as pd
+
+from entity_index import AREA_COLUMN, CAPABILITY_COLUMNS, PILLARS_COLUMN, TYPE_COLUMN, EntityIndex
+
+
+def inventory(pillars):
+    df = pd.DataFrame({PILLARS_COLUMN: pillars, AREA_COLUMN: "Maui", TYPE_COLUMN: "Nonprofit"})
+    return df.assign(**{col: "" for col in CAPABILITY_COLUMNS})
+
+
+def test_combined_pillars_match_each_part():
+    df = inventory([
+        "Device Availability & Affordability",
+        "Device Availability",
+        "Online Accessibility & Inclusivity, Digital Literacy",
+        "Broadband Availability and Affordability",
+    ])
+    index = EntityIndex(df)
+
+    def matched(*pillars):
+        return list(index.rows(index.match(pillars=pillars)))
+
+    assert matched("Device Availability") == [0, 1]
+    assert matched("Device Affordability") == [0]
+    assert matched("Online Accessibility") == matched("Online Inclusivity") == [2]
+    assert matched("Online Inclusivity", "Digital Literacy") == [2]
+    assert matched("Broadband Availability") == matched("Broadband Affordability") == [3]
+    assert "Device Availability & Affordability" not in index.labels["pillar"]
+
+
+def test_pillar_spellings_share_a_posting():
+    index = EntityIndex(inventory(["Digital Navigators", "digital navigator", "Digital Navigators"]))
+    assert index.labels["pillar"] == ["Digital Navigators"]
+    assert index.count(index.match(pillars=["Digital Navigators"])) == 3